@@ -0,0 +1,139 @@
+import signal
+import sys
+from argparse import ArgumentParser, Namespace
+from socket import AF_INET, SOCK_DGRAM, socket
+from time import time
+from typing import Optional
+
+from PySide6.QtCore import QCoreApplication, QObject, Qt, QTimer
+from httpx import Client
+from loguru import logger
+
+from src.config import config
+from src.constants import app_name, app_version, organization_name, organization_website
+from src.core import VoiceClient
+from src.model import ConnectionState, VoicePacket, VoicePacketBuilder
+from src.signal import AudioSignal, Signals
+from src.utils.login import login
+
+
+def parse_args(argv: list[str]) -> Namespace:
+    parser = ArgumentParser(description="Run the voice client without any user interface")
+    parser.add_argument("frequencies", nargs="+", type=float, help="frequencies to listen to, in MHz")
+    parser.add_argument("--account", default=config.account, help="defaults to the saved account")
+    parser.add_argument("--password", default=config.password, help="defaults to the saved password")
+    parser.add_argument("--host", default=config.server_host)
+    parser.add_argument("--tcp-port", type=int, default=config.server_tcp_port)
+    parser.add_argument("--udp-port", type=int, default=config.server_udp_port)
+    parser.add_argument("--record", metavar="DIRECTORY", help="record received transmissions to this directory")
+    parser.add_argument("--forward", metavar="HOST:PORT", help="forward received voice packets over UDP")
+    parser.add_argument("--audio", action="store_true", help="open the sound devices and play received audio")
+    parser.add_argument("--duration", type=float, default=0, help="exit after this many seconds, 0 runs forever")
+    return parser.parse_args(argv)
+
+
+class HeadlessClient(QObject):
+    def __init__(self, args: Namespace):
+        super().__init__()
+        self._args = args
+        self._frequencies = [round(frequency * 1000) for frequency in args.frequencies]
+        self._forward_socket: Optional[socket] = None
+        self._forward_address: Optional[tuple[str, int]] = None
+        if args.forward:
+            host, port = args.forward.rsplit(":", 1)
+            self._forward_address = (host, int(port))
+            self._forward_socket = socket(AF_INET, SOCK_DGRAM)
+
+        self._signals = Signals()
+        self._signals.log_message.connect(lambda name, level, message: logger.log(level.upper(), f"{name}: {message}"))
+        self._voice_client = VoiceClient(self._signals, AudioSignal(), enable_audio=args.audio)
+        self._voice_client.connection_state_changed.connect(self._connection_state_changed)
+        self._voice_client.error_occurred.connect(self._error_occurred)
+        if self._forward_socket is not None:
+            # forwarded straight from the network thread
+            self._voice_client.voice_data_received.connect(self._forward_packet, Qt.ConnectionType.DirectConnection)
+        self._ready = False
+
+    def start(self) -> None:
+        with Client() as client:
+            result = login(client, config.base_url, self._args.account, self._args.password)
+        if not result.success:
+            logger.error(f"Login failed, {result.message}")
+            QCoreApplication.exit(1)
+            return
+        self._voice_client.cid = result.cid
+        self._voice_client.jwt_token = result.token
+        logger.success(f"Logged in as {self._args.account}, cid={self._voice_client.cid}")
+        self._voice_client.connect_to_server(self._args.host, self._args.tcp_port, self._args.udp_port)
+        if self._args.duration > 0:
+            QTimer.singleShot(int(self._args.duration * 1000), QCoreApplication.quit)
+
+    def stop(self) -> None:
+        self._voice_client.cleanup()
+        if self._forward_socket is not None:
+            self._forward_socket.close()
+
+    def _connection_state_changed(self, state: ConnectionState) -> None:
+        if state == ConnectionState.READY:
+            self._ready = True
+            logger.info(f"Connected as {self._voice_client.callsign}")
+            for frequency in self._frequencies:
+                self._voice_client.set_transmitter_receive_flag(frequency, True)
+        elif state == ConnectionState.DISCONNECTED and self._ready:
+            logger.warning("Disconnected from server")
+            QCoreApplication.exit(1)
+
+    def _error_occurred(self, message: str) -> None:
+        logger.error(f"Server error: {message}")
+        if not self._ready:
+            QCoreApplication.exit(1)
+
+    def _forward_packet(self, packet: VoicePacket) -> None:
+        data = VoicePacketBuilder.build_packet(packet.cid, packet.transmitter, packet.frequency,
+                                               packet.callsign, packet.data)
+        try:
+            self._forward_socket.sendto(data, self._forward_address)
+        except OSError as e:
+            logger.warning(f"Fail to forward voice packet, {e}")
+
+
+def main() -> None:
+    from src.utils.logger import logger_init
+    logger_init()
+
+    start_time = time()
+    args = parse_args(sys.argv[1:])
+    if args.record:
+        config.record_enabled = True
+        config.record_path = args.record
+
+    app = QCoreApplication(sys.argv)
+    app.setApplicationName(app_name)
+    app.setApplicationVersion(app_version.version)
+    app.setOrganizationName(organization_name)
+    app.setOrganizationDomain(organization_website)
+    signal.signal(signal.SIGINT, lambda *_: QCoreApplication.quit())
+    # lets the interpreter run the signal handler while Qt is waiting for events
+    interrupt_timer = QTimer()
+    interrupt_timer.timeout.connect(lambda: None)
+    interrupt_timer.start(200)
+
+    client = HeadlessClient(args)
+
+    from src.utils.metrics_exporter import create_metrics_exporter
+    metrics_exporter = create_metrics_exporter()
+    if metrics_exporter is not None:
+        metrics_exporter.start()
+
+    logger.info(f"Headless startup completed in {time() - start_time:.6f}s")
+
+    QTimer.singleShot(0, client.start)
+    exit_code = app.exec()
+    client.stop()
+    if metrics_exporter is not None:
+        metrics_exporter.stop()
+    sys.exit(exit_code)
+
+
+if __name__ == '__main__':
+    main()
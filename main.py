@@ -1,49 +1,85 @@
 import sys
-from time import time
+from argparse import ArgumentParser, Namespace
 
-from PySide6.QtGui import QIcon
-from PySide6.QtWidgets import QApplication
-from loguru import logger
-from qt_material import apply_stylesheet
+from src.startup_profiler import startup_profiler
 
-from src.constants import app_name, app_version, organization_name, organization_website
-from src.utils import QSSLoader
+
+def parse_args() -> Namespace:
+    parser = ArgumentParser(add_help=False)
+    parser.add_argument("--startup-report", metavar="PATH", help="write a startup profile as JSON to this file")
+    parser.add_argument("--exit-after-startup", action="store_true", help="quit once startup has finished")
+    return parser.parse_known_args(sys.argv[1:])[0]
 
 
 def main() -> None:
-    from src.utils.logger import logger_init
+    args = parse_args()
+    if args.startup_report:
+        # everything below is imported lazily so the hook sees it
+        startup_profiler.enable_import_timing()
+
+    with startup_profiler.span("imports"):
+        from PySide6.QtCore import Qt, QTimer
+        from PySide6.QtGui import QIcon
+        from PySide6.QtWidgets import QApplication
+        from loguru import logger
+
+        from src.constants import app_name, app_version, default_theme, organization_name, organization_website
+        from src.utils.logger import logger_init
+        from src.utils.theme import apply_theme
     logger_init()
 
-    start_time = time()
-    last_time = start_time
     logger.info("Application initializing")
-    logger.trace("Creating application")
-    app = QApplication(sys.argv)
-    app.setApplicationName(app_name)
-    app.setApplicationVersion(app_version.version)
-    app.setOrganizationName(organization_name)
-    app.setOrganizationDomain(organization_website)
-    apply_stylesheet(app, theme="dark_teal.xml")
-    logger.trace(f"Create application cost {time() - last_time:.6f}s")
-
-    last_time = time()
-    logger.trace("Importing resource")
-    import resource_rc
-    app.setWindowIcon(QIcon(":/icon/icon"))
-    app.setStyleSheet(QSSLoader.readQssResource(":/style/style/style.qss"))
-    logger.trace(f"Import resource cost {time() - last_time:.6f}s")
-
-    last_time = time()
-    logger.trace("Creating main window")
-    from src.ui.main_window import MainWindow
-    from src.signal import Signals, MouseSignals, KeyBoardSignals, AudioSignal
-    main_window = MainWindow(Signals(), MouseSignals(), KeyBoardSignals(), AudioSignal())
-    logger.trace(f"Create main window cost {time() - last_time:.6f}s")
-
-    logger.info(f"Startup completed in {time() - start_time:.6f}s")
+    with startup_profiler.span("application") as span:
+        app = QApplication(sys.argv)
+        app.setApplicationName(app_name)
+        app.setApplicationVersion(app_version.version)
+        app.setOrganizationName(organization_name)
+        app.setOrganizationDomain(organization_website)
+    logger.trace(f"Create application cost {span.duration:.6f}s")
+
+    with startup_profiler.span("resource") as span:
+        import resource_rc
+        app.setWindowIcon(QIcon(":/icon/icon"))
+    logger.trace(f"Import resource cost {span.duration:.6f}s")
+
+    with startup_profiler.span("stylesheet") as span:
+        apply_theme(app, default_theme, ":/style/style/style.qss")
+    logger.trace(f"Load stylesheet cost {span.duration:.6f}s")
+
+    with startup_profiler.span("main_window") as span:
+        from src.ui.main_window import MainWindow
+        from src.signal import Signals, MouseSignals, KeyBoardSignals, AudioSignal
+        main_window = MainWindow(Signals(), MouseSignals(), KeyBoardSignals(), AudioSignal())
+    logger.trace(f"Create main window cost {span.duration:.6f}s")
+
+    from src.utils.metrics_exporter import create_metrics_exporter
+    metrics_exporter = create_metrics_exporter()
+    if metrics_exporter is not None:
+        metrics_exporter.start()
+
+    def startup_finished() -> None:
+        startup_profiler.mark("audio_ready")
+        startup_profiler.disable_import_timing()
+        logger.info(f"Audio ready after {startup_profiler.elapsed:.6f}s")
+        if args.startup_report:
+            startup_profiler.write_report(args.startup_report)
+            logger.info(f"Startup report written to {args.startup_report}")
+        if args.exit_after_startup:
+            app.quit()
+
+    # startup ends once the background audio warm-up is done, deferred so the window attaches the audio first
+    main_window.audio_warmup.finished.connect(lambda _: QTimer.singleShot(0, startup_finished),
+                                              Qt.ConnectionType.QueuedConnection)
+    main_window.audio_warmup.failed.connect(lambda _: QTimer.singleShot(0, startup_finished),
+                                            Qt.ConnectionType.QueuedConnection)
 
     main_window.show()
+    startup_profiler.mark("window_shown")
+    logger.info(f"Startup completed in {startup_profiler.elapsed:.6f}s")
+
     exit_code = app.exec()
+    if metrics_exporter is not None:
+        metrics_exporter.stop()
     resource_rc.qCleanupResources()
     sys.exit(exit_code)
 
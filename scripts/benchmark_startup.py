@@ -0,0 +1,93 @@
+import sys
+from argparse import ArgumentParser
+from json import dump, load
+from math import ceil
+from os import close, remove
+from os.path import abspath, dirname, join
+from subprocess import TimeoutExpired, run
+from tempfile import mkstemp
+from time import perf_counter
+
+root = dirname(dirname(abspath(__file__)))
+
+
+def percentile(values: list[float], percent: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(0, ceil(percent / 100 * len(ordered)) - 1)]
+
+
+def collect_spans(spans: list[dict], prefix: str, result: dict[str, float]) -> None:
+    for span in spans:
+        name = f"{prefix}{span['name']}"
+        result[name] = result.get(name, 0) + span["duration"]
+        collect_spans(span["children"], f"{name}/", result)
+
+
+def run_once(timeout: float) -> tuple[float, dict]:
+    handle, path = mkstemp(suffix=".json")
+    close(handle)
+    try:
+        start = perf_counter()
+        run([sys.executable, join(root, "main.py"), "--startup-report", path, "--exit-after-startup"],
+            cwd=root, timeout=timeout, check=True)
+        elapsed = perf_counter() - start
+        with open(path, "r", encoding="utf-8") as file:
+            return elapsed, load(file)
+    finally:
+        remove(path)
+
+
+def main() -> None:
+    parser = ArgumentParser(description="Measure cold start time over several runs")
+    parser.add_argument("-n", "--runs", type=int, default=10)
+    parser.add_argument("--timeout", type=float, default=60, help="seconds before a run is killed")
+    parser.add_argument("--imports", type=int, default=15, help="number of slowest imports to show")
+    parser.add_argument("--output", help="also write the summary as JSON")
+    args = parser.parse_args()
+
+    samples: dict[str, list[float]] = {}
+    import_samples: dict[str, list[float]] = {}
+    for index in range(args.runs):
+        try:
+            elapsed, report = run_once(args.timeout)
+        except TimeoutExpired:
+            print(f"Run {index + 1} timed out")
+            continue
+        values = {"process": elapsed, "total": report["total"]}
+        values.update({f"mark:{name}": offset for name, offset in report["marks"].items()})
+        spans: dict[str, float] = {}
+        collect_spans(report["spans"], "", spans)
+        values.update({f"span:{name}": duration for name, duration in spans.items()})
+        for name, value in values.items():
+            samples.setdefault(name, []).append(value)
+        for record in report["imports"]:
+            import_samples.setdefault(record["module"], []).append(record["self"])
+        print(f"Run {index + 1}/{args.runs}: {elapsed:.3f}s")
+
+    if not samples:
+        print("No successful runs")
+        sys.exit(1)
+
+    summary = {
+        name: {"p50": percentile(values, 50), "p90": percentile(values, 90), "p99": percentile(values, 99),
+               "runs": len(values)}
+        for name, values in samples.items()
+    }
+    slowest_imports = sorted(((percentile(values, 50), module) for module, values in import_samples.items()),
+                             reverse=True)[:args.imports]
+
+    print(f"\n{'phase':<48}{'p50':>10}{'p90':>10}{'p99':>10}")
+    for name, result in summary.items():
+        print(f"{name:<48}{result['p50']:>10.3f}{result['p90']:>10.3f}{result['p99']:>10.3f}")
+    print(f"\n{'import':<48}{'p50 self':>10}")
+    for duration, module in slowest_imports:
+        print(f"{module:<48}{duration:>10.4f}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            dump({"phases": summary, "imports": {module: duration for duration, module in slowest_imports}},
+                 file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
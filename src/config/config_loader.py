@@ -7,7 +7,10 @@ from typing import Callable
 
 from loguru import logger
 
-from src.constants import config_path, config_version
+from src.constants import (config_path, config_version, default_ptt_hang_time, default_ptt_pre_roll,
+                           default_record_path, default_record_split_time, default_replay_buffer_time,
+                           default_capture_path, default_fsuipc_poll_interval, fsuipc_backend_dll,
+                           default_metrics_port, default_metrics_textfile)
 from src.model.config import VersionType
 from src.utils.file_utils import check_directory
 from src.utils.version import Version
@@ -57,6 +60,24 @@ class Config(BaseConfig):
     audio_input: str = "默认"
     audio_output: str = "默认"
     ptt_key: str = "Key.ctrl_l"
+    ptt_pre_roll: int = default_ptt_pre_roll
+    ptt_hang_time: int = default_ptt_hang_time
+    ptt_bindings: dict[str, dict] = {}  # key -> {"type": "transmitter" | "frequency", "value": int}
+    record_enabled: bool = False
+    record_path: str = default_record_path
+    record_split_time: int = default_record_split_time
+    transmission_index: bool = False
+    replay_buffer_time: int = default_replay_buffer_time
+    replay_key: str = ""
+    packet_capture: bool = False
+    capture_path: str = default_capture_path
+    fsuipc_poll_interval: int = default_fsuipc_poll_interval
+    fsuipc_backend: str = fsuipc_backend_dll  # dll or fake
+    fsuipc_timeline: str = ""  # timeline file for the fake backend
+    metrics_export: str = ""  # empty, http or textfile
+    metrics_port: int = default_metrics_port
+    metrics_textfile: str = default_metrics_textfile
+    metrics_textfile_interval: int = 15  # s
     _config_save_callbacks: list[Callable[[], None]] = []
 
     def parse_config(self, data: dict) -> None:
@@ -105,7 +126,25 @@ class Config(BaseConfig):
             "audio_driver": self.audio_driver,
             "audio_input": self.audio_input,
             "audio_output": self.audio_output,
-            "ptt_key": self.ptt_key
+            "ptt_key": self.ptt_key,
+            "ptt_pre_roll": self.ptt_pre_roll,
+            "ptt_hang_time": self.ptt_hang_time,
+            "ptt_bindings": self.ptt_bindings,
+            "record_enabled": self.record_enabled,
+            "record_path": self.record_path,
+            "record_split_time": self.record_split_time,
+            "transmission_index": self.transmission_index,
+            "replay_buffer_time": self.replay_buffer_time,
+            "replay_key": self.replay_key,
+            "packet_capture": self.packet_capture,
+            "capture_path": self.capture_path,
+            "fsuipc_poll_interval": self.fsuipc_poll_interval,
+            "fsuipc_backend": self.fsuipc_backend,
+            "fsuipc_timeline": self.fsuipc_timeline,
+            "metrics_export": self.metrics_export,
+            "metrics_port": self.metrics_port,
+            "metrics_textfile": self.metrics_textfile,
+            "metrics_textfile_interval": self.metrics_textfile_interval
         }
         if not data["remember_me"]:
             data["account"] = ""
@@ -18,3 +18,35 @@ default_sample_rate: int = 44100
 default_channels: int = 1
 default_frame_time: int = 10  # ms
 default_frame_size: int = int(opus_default_sample_rate / (1000 / default_frame_time))
+default_ptt_pre_roll: int = 100  # ms
+default_ptt_hang_time: int = 100  # ms
+ptt_pre_roll_range: tuple[int, int] = (50, 200)  # ms
+ptt_binding_transmitter: str = "transmitter"
+ptt_binding_frequency: str = "frequency"
+default_record_path: str = "recordings"
+default_record_split_time: int = 60  # min
+transmission_gap_time: float = 0.3  # s
+default_replay_buffer_time: int = 10  # min
+transmission_index_file: str = "transmissions.db"
+default_capture_path: str = "captures"
+default_fsuipc_poll_interval: int = 100  # ms
+fsuipc_backend_dll: str = "dll"
+fsuipc_backend_fake: str = "fake"
+simulator_connect_timeout: float = 60  # s
+simulator_retry_initial_delay: float = 0.25  # s
+simulator_retry_max_delay: float = 2  # s
+log_view_max_lines: int = 1000
+log_flush_interval: int = 100  # ms
+active_speaker_refresh_interval: int = 250  # ms
+level_meter_interval: int = 50  # ms
+level_bar_floor: float = -60  # dBFS
+diagnostics_refresh_interval: int = 500  # ms
+metrics_prefix: str = "audio_client_"
+metrics_export_http: str = "http"
+metrics_export_textfile: str = "textfile"
+default_metrics_port: int = 9464
+default_metrics_textfile: str = "metrics/audio_client.prom"
+default_theme: str = "dark_teal.xml"
+audio_device_poll_interval: float = 2  # s
+audio_device_switch_debounce: float = 0.3  # s
+audio_device_handover_timeout: float = 0.5  # s
@@ -1 +1,7 @@
-from .voice_client import VoiceClient
+# VoiceClient pulls in Qt and the config, it is only imported once asked for so that
+# submodules such as packet_capture stay usable on their own
+def __getattr__(name: str):
+    if name == "VoiceClient":
+        from .voice_client import VoiceClient
+        return VoiceClient
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
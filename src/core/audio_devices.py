@@ -0,0 +1,180 @@
+import sys
+from dataclasses import dataclass
+from threading import Event, Lock, Thread
+from typing import Callable, Optional
+
+from PySide6.QtCore import QObject, Signal
+from loguru import logger
+from pyaudio import PyAudio, Stream
+
+from src.constants import audio_device_poll_interval
+
+
+@dataclass(frozen=True)
+class AudioDevice:
+    index: int
+    name: str
+    host_api: int
+    max_input_channels: int
+    max_output_channels: int
+    default_sample_rate: int
+
+
+def _device_count_function() -> Optional[Callable[[], tuple[int, int]]]:
+    # PortAudio only scans devices in Pa_Initialize, winmm reports hot-plugged devices without rescanning
+    if sys.platform != "win32":
+        return None
+    try:
+        from ctypes import windll
+        winmm = windll.winmm
+    except (ImportError, OSError):
+        return None
+    return lambda: (winmm.waveInGetNumDevs(), winmm.waveOutGetNumDevs())
+
+
+# One PortAudio instance shared by the audio handler and the config window. Devices are enumerated once and
+# again only after a device was plugged in or removed, and never while a stream is open.
+class AudioDeviceRegistry(QObject):
+    devices_changed = Signal()
+
+    def __init__(self, poll_interval: float = audio_device_poll_interval):
+        super().__init__()
+        self._poll_interval = poll_interval
+        self._lock = Lock()
+        self._audio: Optional[PyAudio] = None
+        self._host_apis: dict[str, int] = {}
+        self._devices: dict[int, AudioDevice] = {}
+        self._default_input: Optional[int] = None
+        self._default_output: Optional[int] = None
+        self._open_streams = 0
+        self._stale = False
+        self._device_count = _device_count_function()
+        self._stop_event: Optional[Event] = None
+
+    def initialize(self) -> None:
+        with self._lock:
+            if self._audio is None:
+                self._audio = PyAudio()
+                self._enumerate()
+
+    def _enumerate(self) -> None:
+        audio = self._audio
+        self._host_apis = {}
+        for i in range(audio.get_host_api_count()):
+            host_info = audio.get_host_api_info_by_index(i)
+            self._host_apis[host_info["name"]] = i
+        devices = {}
+        for i in range(audio.get_device_count()):
+            info = audio.get_device_info_by_index(i)
+            name = info["name"]
+            try:
+                name = name.encode("GBK").decode("utf8")
+            except (UnicodeEncodeError, UnicodeDecodeError):
+                pass
+            devices[i] = AudioDevice(i, name, info["hostApi"], info["maxInputChannels"],
+                                     info["maxOutputChannels"], int(info["defaultSampleRate"]))
+        self._devices = devices
+        self._default_input = self._default_device_index(audio.get_default_input_device_info)
+        self._default_output = self._default_device_index(audio.get_default_output_device_info)
+        logger.debug(f"Found {len(devices)} audio devices on {len(self._host_apis)} host apis")
+
+    @staticmethod
+    def _default_device_index(function: Callable[[], dict]) -> Optional[int]:
+        try:
+            return function()["index"]
+        except IOError:
+            return None
+
+    def start(self) -> None:
+        if self._device_count is None or self._stop_event is not None:
+            return
+        self._stop_event = Event()
+        Thread(target=self._watch, args=(self._stop_event,), daemon=True).start()
+
+    def stop(self) -> None:
+        if self._stop_event is not None:
+            self._stop_event.set()
+            self._stop_event = None
+
+    def _watch(self, stop_event: Event) -> None:
+        device_count = self._device_count()
+        while not stop_event.wait(self._poll_interval):
+            count = self._device_count()
+            if count == device_count:
+                continue
+            device_count = count
+            logger.info("Audio devices changed")
+            self.refresh()
+
+    def refresh(self) -> None:
+        with self._lock:
+            if self._audio is None:
+                return
+            if self._open_streams > 0:
+                # picked up again once the last stream is closed
+                self._stale = True
+                return
+            self._audio.terminate()
+            self._audio = PyAudio()
+            self._enumerate()
+            self._stale = False
+        self.devices_changed.emit()
+
+    def open_stream(self, **kwargs) -> Stream:
+        with self._lock:
+            stream = self._audio.open(**kwargs)
+            self._open_streams += 1
+            return stream
+
+    def close_stream(self, stream: Stream) -> None:
+        stream.stop_stream()
+        stream.close()
+        with self._lock:
+            self._open_streams -= 1
+            refresh = self._stale and self._open_streams == 0
+        if refresh:
+            Thread(target=self.refresh, daemon=True).start()
+
+    def terminate(self) -> None:
+        self.stop()
+        with self._lock:
+            if self._audio is not None:
+                self._audio.terminate()
+                self._audio = None
+
+    @property
+    def host_apis(self) -> dict[str, int]:
+        return self._host_apis
+
+    def devices(self, host_api: int) -> tuple[dict[str, int], dict[str, int]]:
+        # device name -> index, the best device is kept when a name shows up more than once
+        input_devices: dict[str, AudioDevice] = {}
+        output_devices: dict[str, AudioDevice] = {}
+        for device in self._devices.values():
+            if device.host_api != host_api:
+                continue
+            if device.max_output_channels > 0:
+                current = output_devices.get(device.name)
+                if (current is None or current.default_sample_rate < device.default_sample_rate or
+                        current.max_output_channels < device.max_output_channels):
+                    output_devices[device.name] = device
+            if device.max_input_channels > 0:
+                current = input_devices.get(device.name)
+                if (current is None or current.default_sample_rate < device.default_sample_rate or
+                        current.max_input_channels < device.max_input_channels):
+                    input_devices[device.name] = device
+        return ({name: device.index for name, device in input_devices.items()},
+                {name: device.index for name, device in output_devices.items()})
+
+    def find_device(self, device: AudioDevice, is_input: bool) -> Optional[AudioDevice]:
+        # the same device after a rescan, matched by name and host api since indexes are reassigned
+        input_devices, output_devices = self.devices(device.host_api)
+        index = (input_devices if is_input else output_devices).get(device.name)
+        return None if index is None else self._devices.get(index)
+
+    def input_device(self, index: int) -> Optional[AudioDevice]:
+        # -1 selects the system default
+        return self._devices.get(self._default_input if index == -1 else index)
+
+    def output_device(self, index: int) -> Optional[AudioDevice]:
+        return self._devices.get(self._default_output if index == -1 else index)
@@ -1,169 +1,452 @@
+from collections import deque
 from queue import Empty, Full, Queue
+from threading import Condition, Lock, Thread
+from time import monotonic, perf_counter, sleep
 from typing import Callable, Optional
 
 from loguru import logger
-from numpy import float32, frombuffer, int16, zeros
-from pyaudio import PyAudio, Stream, paContinue, paFloat32, paInt16
+from numpy import clip, float32, frombuffer, int16, linspace, ndarray, zeros
+from pyaudio import Stream, paComplete, paContinue, paFloat32, paInt16
 from soxr import resample
 
-from src.constants import default_channels, default_frame_size, default_sample_rate, opus_default_sample_rate
+from src.config import config
+from src.constants import (audio_device_handover_timeout, audio_device_switch_debounce, default_channels,
+                           default_frame_size, default_frame_time, default_sample_rate, opus_default_sample_rate,
+                           ptt_pre_roll_range)
 from src.signal.audio_signal import AudioSignal
+from src.utils.metrics import metrics
+from .audio_devices import AudioDevice, AudioDeviceRegistry
 from .codecs.opus_decoder import OpusDecoder
 from .codecs.opus_encoder import OpusEncoder
+from .level_meter import LevelMeter
+
+_input_callback_time = metrics.histogram("audio_input_callback_seconds", "Time spent in the capture callback")
+_output_callback_time = metrics.histogram("audio_output_callback_seconds", "Time spent in the playback callback")
+_output_queue_depth = metrics.gauge("audio_output_queue_depth", "Encoded packets waiting for playback")
+_encoded_frames = metrics.counter("audio_encoded_frames_total", "Frames encoded for transmission")
+_decode_errors = metrics.counter("audio_decode_errors_total", "Received packets that failed to decode")
+_dropped_packets = metrics.counter("audio_dropped_packets_total", "Received packets dropped by a full output queue")
 
 
 class AudioHandler:
-    def __init__(self, audio_signal: AudioSignal):
+    def __init__(self, audio_signal: AudioSignal, devices: AudioDeviceRegistry):
         self._input_sample_rate = default_sample_rate
         self._output_sample_rate = default_sample_rate
 
         self._channels = default_channels
         self._frame_size = default_frame_size
 
-        self._input_frame_size = int(default_frame_size * self._input_sample_rate / opus_default_sample_rate)
-        self._output_frame_size = int(default_frame_size * self._output_sample_rate / opus_default_sample_rate)
-
-        self._audio = PyAudio()
+        self._devices = devices
         self._input_stream: Optional[Stream] = None
         self._output_stream: Optional[Stream] = None
+        # guards which stream is current, never held inside an audio callback
+        self._stream_lock = Lock()
+        self._input_lock = Lock()
+        self._output_lock = Lock()
+        # generation of the last opened stream and of the stream currently delivering frames
+        self._input_generations = 0
+        self._input_generation = 0
+        self._output_generations = 0
+        self._output_generation = 0
+
+        self._switch_condition = Condition()
+        # a single worker applies switches until none are pending, set to None by the worker as it exits
+        self._switch_thread: Optional[Thread] = None
+        self._switch_closed = False
+        self._switch_deadline = 0.0
+        self._pending_input: Optional[int] = None
+        self._pending_output: Optional[int] = None
 
         self._encoder = OpusEncoder(opus_default_sample_rate, default_channels, default_frame_size)
         self._decoder = OpusDecoder(opus_default_sample_rate, default_channels, default_frame_size)
+        self._replay_decoder = OpusDecoder(opus_default_sample_rate, default_channels, default_frame_size)
 
-        self._output_queue = Queue()
+        # (frequency, encoded data)
+        self._output_queue: Queue[tuple[int, bytes]] = Queue()
+        self._replay_queue = Queue()
+        self._input_meter = LevelMeter(32768)
+        # replaced instead of mutated when a frequency is added, readers iterate without locking
+        self._playback_meters: dict[int, LevelMeter] = {}
 
         self._is_recording = False
         self._is_playing = False
         self._ptt_active = False
+        self._transmitting = False
+        self._pre_roll: deque[ndarray] = deque()
+        self._hang_frames = 0
+        self._hang_frames_left = 0
         self._input_device: Optional[int] = None
         self._output_device: Optional[int] = None
+        # the selected devices, kept to find them again after a rescan renumbered them
+        self._input_device_info: Optional[AudioDevice] = None
+        self._output_device_info: Optional[AudioDevice] = None
 
         self._on_encoded_audio: Optional[Callable] = None
 
         self.audio_signal = audio_signal
-        self.audio_signal.ptt_status_change.connect(self.set_ptt_state)
         self.audio_signal.audio_input_device_change.connect(self.input_device_change)
         self.audio_signal.audio_output_device_change.connect(self.output_device_change)
+        # runs on the thread that rescanned, the registry only rescans while no stream is open
+        self._devices.devices_changed.connect(self._devices_changed)
+
+        self.set_pre_roll(config.ptt_pre_roll)
+        self.set_hang_time(config.ptt_hang_time)
+        config.add_config_save_callback(self._config_update)
+
+    def _config_update(self):
+        self.set_pre_roll(config.ptt_pre_roll)
+        self.set_hang_time(config.ptt_hang_time)
+
+    def set_pre_roll(self, pre_roll: int):
+        pre_roll = max(ptt_pre_roll_range[0], min(ptt_pre_roll_range[1], pre_roll))
+        self._pre_roll = deque(maxlen=max(1, pre_roll // default_frame_time))
+
+    def set_hang_time(self, hang_time: int):
+        self._hang_frames = max(0, hang_time // default_frame_time)
 
     def input_device_change(self, index: int):
-        if index == -1:
-            self._input_device = None
-        else:
-            self._input_device = index
-        info = self._audio.get_device_info_by_index(index)
-        self._input_sample_rate = int(info["defaultSampleRate"])
-        self._input_frame_size = int(default_frame_size * self._input_sample_rate / opus_default_sample_rate)
-        if self._is_recording:
-            self.stop_recording()
-            self.start_recording()
+        self._request_switch(input_index=index)
 
     def output_device_change(self, index: int):
-        if index == -1:
-            self._output_device = None
-        else:
-            self._output_device = index
-        info = self._audio.get_device_info_by_index(index)
-        self._output_sample_rate = int(info["defaultSampleRate"])
-        self._output_frame_size = int(default_frame_size * self._output_sample_rate / opus_default_sample_rate)
-        if self._is_playing:
-            self.stop_playback()
-            self.start_playback()
+        self._request_switch(output_index=index)
+
+    def _devices_changed(self):
+        with self._stream_lock:
+            self._input_device, self._input_device_info = self._resolve_device(self._input_device_info, True)
+            self._output_device, self._output_device_info = self._resolve_device(self._output_device_info, False)
+
+    def _resolve_device(self, device: Optional[AudioDevice],
+                        is_input: bool) -> tuple[Optional[int], Optional[AudioDevice]]:
+        if device is None:
+            return None, None
+        current = self._devices.find_device(device, is_input)
+        if current is None:
+            logger.warning(f"Audio device {device.name} is gone, using the default device")
+            return None, None
+        if current.index != device.index:
+            logger.debug(f"Audio device {device.name} moved from index {device.index} to {current.index}")
+        return current.index, current
+
+    def _request_switch(self, input_index: Optional[int] = None, output_index: Optional[int] = None):
+        # combo boxes fire several changes in a row, only the last one within the debounce time is applied
+        with self._switch_condition:
+            if self._switch_closed:
+                return
+            if input_index is not None:
+                self._pending_input = input_index
+            if output_index is not None:
+                self._pending_output = output_index
+            self._switch_deadline = monotonic() + audio_device_switch_debounce
+            if self._switch_thread is None:
+                self._switch_thread = Thread(target=self._switch_devices, daemon=True)
+                self._switch_thread.start()
+            self._switch_condition.notify()
+
+    def _switch_devices(self):
+        while True:
+            with self._switch_condition:
+                while not self._switch_closed and (remaining := self._switch_deadline - monotonic()) > 0:
+                    self._switch_condition.wait(remaining)
+                input_index, output_index = self._pending_input, self._pending_output
+                self._pending_input = self._pending_output = None
+                if self._switch_closed or (input_index is None and output_index is None):
+                    self._switch_thread = None
+                    return
+            # requests arriving meanwhile are picked up by the next round
+            if input_index is not None:
+                self._switch_input(input_index)
+            if output_index is not None:
+                self._switch_output(output_index)
+
+    def _switch_input(self, index: int):
+        device_info = self._devices.input_device(index)
+        device = None if index == -1 else index
+        sample_rate = self._input_sample_rate if device_info is None else device_info.default_sample_rate
+        with self._stream_lock:
+            if device == self._input_device and sample_rate == self._input_sample_rate:
+                return
+            previous_device, previous_sample_rate = self._input_device, self._input_sample_rate
+            previous_info = self._input_device_info
+            self._input_device = device
+            self._input_device_info = None if device is None else device_info
+            self._input_sample_rate = sample_rate
+            old_stream = self._input_stream
+            if not self._is_recording:
+                return
+            try:
+                # the old stream keeps capturing until the new one delivers its first frame
+                self._input_stream = self._open_input_stream()
+                self._input_stream.start_stream()
+                generation = self._input_generations
+            except Exception as e:
+                self._input_stream = old_stream
+                self._input_device, self._input_sample_rate = previous_device, previous_sample_rate
+                self._input_device_info = previous_info
+                logger.error(f"Failed to switch audio input: {e}")
+                return
+        if old_stream is not None:
+            self._wait_for_handover(lambda: self._input_generation, generation)
+            self._devices.close_stream(old_stream)
+        logger.info(f"Switched audio input to {device_info.name if device_info else 'default device'}")
+
+    def _switch_output(self, index: int):
+        device_info = self._devices.output_device(index)
+        device = None if index == -1 else index
+        sample_rate = self._output_sample_rate if device_info is None else device_info.default_sample_rate
+        with self._stream_lock:
+            if device == self._output_device and sample_rate == self._output_sample_rate:
+                return
+            previous_device, previous_sample_rate = self._output_device, self._output_sample_rate
+            previous_info = self._output_device_info
+            self._output_device = device
+            self._output_device_info = None if device is None else device_info
+            self._output_sample_rate = sample_rate
+            old_stream = self._output_stream
+            if not self._is_playing:
+                return
+            try:
+                self._output_stream = self._open_output_stream()
+                self._output_stream.start_stream()
+                generation = self._output_generations
+            except Exception as e:
+                self._output_stream = old_stream
+                self._output_device, self._output_sample_rate = previous_device, previous_sample_rate
+                self._output_device_info = previous_info
+                logger.error(f"Failed to switch audio output: {e}")
+                return
+        if old_stream is not None:
+            self._wait_for_handover(lambda: self._output_generation, generation)
+            self._devices.close_stream(old_stream)
+        logger.info(f"Switched audio output to {device_info.name if device_info else 'default device'}")
+
+    @staticmethod
+    def _wait_for_handover(current_generation: Callable[[], int], generation: int):
+        deadline = monotonic() + audio_device_handover_timeout
+        while current_generation() < generation and monotonic() < deadline:
+            sleep(default_frame_time / 1000)
+
+    def _open_input_stream(self) -> Stream:
+        self._input_generations += 1
+        sample_rate = self._input_sample_rate
+        return self._devices.open_stream(
+            format=paInt16,
+            channels=self._channels,
+            rate=sample_rate,
+            input=True,
+            input_device_index=self._input_device,
+            frames_per_buffer=int(default_frame_size * sample_rate / opus_default_sample_rate),
+            stream_callback=self._input_callback(self._input_generations, sample_rate)
+        )
+
+    def _open_output_stream(self) -> Stream:
+        self._output_generations += 1
+        sample_rate = self._output_sample_rate
+        return self._devices.open_stream(
+            format=paFloat32,
+            channels=self._channels,
+            rate=sample_rate,
+            output=True,
+            output_device_index=self._output_device,
+            frames_per_buffer=int(default_frame_size * sample_rate / opus_default_sample_rate),
+            stream_callback=self._output_callback(self._output_generations, sample_rate)
+        )
 
     def start_recording(self):
-        if self._is_recording:
-            return
-        try:
-            self._input_stream = self._audio.open(
-                format=paInt16,
-                channels=self._channels,
-                rate=self._input_sample_rate,
-                input=True,
-                input_device_index=self._input_device,
-                frames_per_buffer=self._input_frame_size,
-                stream_callback=self._input_callback
-            )
-            self._is_recording = True
-            self._input_stream.start_stream()
-            logger.info("Started audio recording")
-        except Exception as e:
-            logger.error(f"Failed to start recording: {e}")
+        with self._stream_lock:
+            if self._is_recording:
+                return
+            try:
+                self._transmitting = False
+                self._pre_roll.clear()
+                self._input_stream = self._open_input_stream()
+                self._is_recording = True
+                self._input_stream.start_stream()
+                logger.info("Started audio recording")
+            except Exception as e:
+                logger.error(f"Failed to start recording: {e}")
 
     def stop_recording(self):
-        if self._input_stream:
-            self._input_stream.stop_stream()
-            self._input_stream.close()
+        with self._stream_lock:
+            stream = self._input_stream
             self._input_stream = None
-        self._is_recording = False
+            self._is_recording = False
+        if stream is not None:
+            self._devices.close_stream(stream)
         logger.info("Stopped audio recording")
 
     def start_playback(self):
-        if self._is_playing:
-            return
-        try:
-            self._output_stream = self._audio.open(
-                format=paFloat32,
-                channels=self._channels,
-                rate=self._output_sample_rate,
-                output=True,
-                output_device_index=self._output_device,
-                frames_per_buffer=self._output_frame_size,
-                stream_callback=self._output_callback
-            )
-            self._is_playing = True
-            self._output_stream.start_stream()
-            logger.info("Started audio playback")
-        except Exception as e:
-            logger.error(f"Failed to start playback: {e}")
+        with self._stream_lock:
+            if self._is_playing:
+                return
+            try:
+                self._output_stream = self._open_output_stream()
+                self._is_playing = True
+                self._output_stream.start_stream()
+                logger.info("Started audio playback")
+            except Exception as e:
+                logger.error(f"Failed to start playback: {e}")
 
     def stop_playback(self):
-        if self._output_stream:
-            self._output_stream.stop_stream()
-            self._output_stream.close()
+        with self._stream_lock:
+            stream = self._output_stream
             self._output_stream = None
-        self._is_playing = False
+            self._is_playing = False
+        if stream is not None:
+            self._devices.close_stream(stream)
         logger.info("Stopped audio playback")
 
-    def _input_callback(self, in_data, _, __, ___):
-        if self._ptt_active and self._on_encoded_audio:
-            audio_data = frombuffer(in_data, dtype=int16)
-            resampled_audio = resample(audio_data, self._input_sample_rate, opus_default_sample_rate)
-            if len(resampled_audio) == 0:
-                logger.warning("empty data")
-                return None, paContinue
-            encoded_data = self._encoder.encode(resampled_audio)
-            if encoded_data:
-                self._on_encoded_audio(encoded_data)
-        return None, paContinue
-
-    def _output_callback(self, _, frame_count: int, __, ___):
+    # Every stream gets its own generation. The first callback of a newer stream takes over, the older stream
+    # completes on its next callback, so a device switch happens on a frame boundary without a gap.
+    def _input_callback(self, generation: int, sample_rate: int) -> Callable:
+        def callback(in_data, _, __, ___):
+            if generation != self._input_generation:
+                if generation < self._input_generation:
+                    return None, paComplete
+                self._input_generation = generation
+            start = perf_counter()
+            # both streams may be inside a callback while handing over
+            with self._input_lock:
+                self._process_input(in_data, sample_rate)
+            _input_callback_time.observe(perf_counter() - start)
+            return None, paContinue
+
+        return callback
+
+    def _process_input(self, in_data: bytes, sample_rate: int):
+        audio_data = frombuffer(in_data, dtype=int16)
+        self._input_meter.process(audio_data)
+        if self._on_encoded_audio is None:
+            return
+        resampled_audio = resample(audio_data, sample_rate, opus_default_sample_rate)
+        if len(resampled_audio) == 0:
+            logger.warning("empty data")
+            return
+        if self._ptt_active:
+            if not self._transmitting:
+                self._transmitting = True
+                while self._pre_roll:
+                    self._encode_and_send(self._pre_roll.popleft())
+            self._hang_frames_left = self._hang_frames
+            self._encode_and_send(resampled_audio)
+        elif self._transmitting:
+            # keep sending for the hang time so the tail of the last word is not cut off
+            self._encode_and_send(resampled_audio)
+            self._hang_frames_left -= 1
+            if self._hang_frames_left <= 0:
+                self._transmitting = False
+        else:
+            self._pre_roll.append(resampled_audio)
+
+    def _encode_and_send(self, audio_data: ndarray):
+        encoded_data = self._encoder.encode(audio_data)
+        if encoded_data:
+            _encoded_frames.inc()
+            self._on_encoded_audio(encoded_data)
+
+    @staticmethod
+    def _next_frame(queue: Queue, decoder: OpusDecoder) -> Optional[ndarray]:
+        try:
+            return decoder.decode(queue.get_nowait())
+        except Empty:
+            return None
+
+    def _playback_meter(self, frequency: int) -> LevelMeter:
+        meter = self._playback_meters.get(frequency)
+        if meter is None:
+            meter = LevelMeter()
+            self._playback_meters = {**self._playback_meters, frequency: meter}
+        return meter
+
+    def _output_callback(self, generation: int, sample_rate: int) -> Callable:
+        def callback(_, frame_count: int, __, ___):
+            fade_in = False
+            if generation != self._output_generation:
+                if generation < self._output_generation:
+                    return zeros(frame_count, dtype=float32).tobytes(), paComplete
+                # taking over from a stream that was playing, start the new device without a click
+                fade_in = self._output_generation != 0
+                self._output_generation = generation
+            start = perf_counter()
+            with self._output_lock:
+                output_data = self._next_output(frame_count, sample_rate)
+            if output_data is not None and fade_in:
+                output_data *= linspace(0, 1, output_data.size, dtype=float32)
+            _output_callback_time.observe(perf_counter() - start)
+            if output_data is None:
+                return zeros(frame_count, dtype=float32).tobytes(), paContinue
+            return output_data.tobytes(), paContinue
+
+        return callback
+
+    def _next_output(self, frame_count: int, sample_rate: int) -> Optional[ndarray]:
+        _output_queue_depth.set(self._output_queue.qsize())
+        audio_data = None
         try:
-            encoded_data = self._output_queue.get_nowait()
+            frequency, encoded_data = self._output_queue.get_nowait()
             audio_data = self._decoder.decode(encoded_data)
-            if audio_data is not None:
-                resampled_audio = resample(audio_data, opus_default_sample_rate, self._output_sample_rate)
-                if resampled_audio.size != frame_count:
-                    logger.warning(f"Resampling audio with {frame_count} frames")
-                output_data = resampled_audio.astype(float32).tobytes()
-                return output_data, paContinue
+            if audio_data is None:
+                _decode_errors.inc()
+            else:
+                self._playback_meter(frequency).process(audio_data)
         except Empty:
             pass
-        silence = zeros(frame_count, dtype=float32).tobytes()
-        return silence, paContinue
+        replay_data = self._next_frame(self._replay_queue, self._replay_decoder)
+        if replay_data is not None:
+            # replayed audio is mixed on top of live audio instead of queued behind it
+            audio_data = replay_data if audio_data is None else clip(audio_data + replay_data, -1.0, 1.0)
+        if audio_data is None:
+            return None
+        resampled_audio = resample(audio_data, opus_default_sample_rate, sample_rate)
+        if resampled_audio.size != frame_count:
+            logger.warning(f"Resampling audio with {frame_count} frames")
+        return resampled_audio.astype(float32)
 
-    def play_encoded_audio(self, encoded_data: bytes):
+    def play_encoded_audio(self, encoded_data: bytes, frequency: int = 0):
         try:
-            self._output_queue.put_nowait(encoded_data)
+            self._output_queue.put_nowait((frequency, encoded_data))
         except Full:
+            _dropped_packets.inc()
             logger.warning("Output queue full, dropping audio packet")
 
+    def play_replay(self, packets: list[bytes]):
+        while not self._replay_queue.empty():
+            try:
+                self._replay_queue.get_nowait()
+            except Empty:
+                break
+        for encoded_data in packets:
+            self._replay_queue.put_nowait(encoded_data)
+
     def set_ptt_state(self, active: bool):
         self._ptt_active = active
         logger.debug(f"PTT state: {active}")
 
     def cleanup(self):
+        # a switch in progress still closes its old stream, that has to happen before PortAudio is terminated
+        with self._switch_condition:
+            self._switch_closed = True
+            switch_thread = self._switch_thread
+            self._switch_condition.notify()
+        if switch_thread is not None:
+            switch_thread.join(2 * audio_device_handover_timeout + 1)
+            if switch_thread.is_alive():
+                logger.warning("Audio device switch did not finish before cleanup")
         self.stop_recording()
         self.stop_playback()
-        self._audio.terminate()
+        self._devices.terminate()
+
+    @property
+    def device_registry(self) -> AudioDeviceRegistry:
+        return self._devices
+
+    @property
+    def input_meter(self) -> LevelMeter:
+        return self._input_meter
+
+    # frequency -> meter of the audio played for it
+    @property
+    def playback_meters(self) -> dict[int, LevelMeter]:
+        return self._playback_meters
 
     @property
     def on_encoded_audio(self) -> Callable[[bytes], None]:
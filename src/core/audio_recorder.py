@@ -0,0 +1,142 @@
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from os.path import join
+from queue import Empty, Queue
+from random import getrandbits
+from threading import Event, Lock, Thread
+from time import time
+from typing import Optional, Union
+
+from loguru import logger
+
+from src.constants import default_frame_size, opus_default_sample_rate, transmission_gap_time
+from src.utils.file_utils import check_directory
+from .codecs.ogg_opus_writer import OggOpusWriter
+
+
+@dataclass
+class RecordFile:
+    path: str
+    writer: OggOpusWriter
+    start_time: float
+    last_packet_time: float = 0
+
+
+class AudioRecorder:
+    def __init__(self, directory: str, split_time: int, frame_size: int = default_frame_size):
+        self._directory = directory
+        self._split_time = split_time
+        self._frame_size = frame_size
+        # an Event is a barrier, it is set once everything queued before it was written
+        self._queue: Queue[Optional[Union[tuple[int, int, float, bytes], Event]]] = Queue()
+        # one file per speaker on a frequency, so simultaneous transmissions don't interleave
+        self._files: dict[tuple[int, int], RecordFile] = {}
+        self._thread: Optional[Thread] = None
+        # (frequency, cid) -> (packet timestamp, path, byte offset) of the page each burst of activity starts on
+        self._marks: dict[tuple[int, int], deque[tuple[float, str, int]]] = {}
+        self._marks_lock = Lock()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        check_directory(self._directory, create_if_not_exist=True)
+        self._thread = Thread(target=self._write_loop, daemon=True)
+        self._thread.start()
+        logger.info(f"Recording audio to {self._directory}")
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+        logger.info("Stopped audio recording")
+
+    def write(self, frequency: int, cid: int, data: bytes, timestamp: Optional[float] = None) -> None:
+        if self._thread is None or not data:
+            return
+        self._queue.put_nowait((frequency, cid, time() if timestamp is None else timestamp, data))
+
+    def sync(self, timeout: float = 1.0) -> bool:
+        # wait until every packet queued so far has been written and has its mark
+        if self._thread is None:
+            return False
+        barrier = Event()
+        self._queue.put_nowait(barrier)
+        return barrier.wait(timeout)
+
+    def locate(self, frequency: int, cid: int, timestamp: float) -> Optional[tuple[str, int]]:
+        with self._marks_lock:
+            marks = self._marks.get((frequency, cid), ())
+            for mark_time, path, offset in reversed(marks):
+                if mark_time <= timestamp:
+                    return path, offset
+        return None
+
+    def _write_loop(self) -> None:
+        while True:
+            try:
+                item = self._queue.get(timeout=1)
+            except Empty:
+                self._flush_files()
+                continue
+            if item is None:
+                break
+            if isinstance(item, Event):
+                item.set()
+                continue
+            try:
+                self._write_packet(*item)
+            except Exception as e:
+                logger.error(f"Failed to write recording: {e}")
+        for record_file in self._files.values():
+            record_file.writer.close()
+        self._files.clear()
+
+    def _open_file(self, frequency: int, cid: int, timestamp: float) -> RecordFile:
+        start = datetime.fromtimestamp(timestamp)
+        path = join(self._directory, f"{start.strftime('%Y%m%d-%H%M%S')}_{frequency / 1000:.3f}_{cid}.opus")
+        writer = OggOpusWriter(open(path, "wb"), getrandbits(32), comments={
+            "frequency": f"{frequency / 1000:.3f}",
+            "cid": str(cid),
+            "date": start.isoformat()
+        })
+        logger.debug(f"Open recording file {path}")
+        return RecordFile(path, writer, timestamp)
+
+    def _write_packet(self, frequency: int, cid: int, timestamp: float, data: bytes) -> None:
+        key = (frequency, cid)
+        record_file = self._files.get(key)
+        if record_file is not None and timestamp - record_file.start_time >= self._split_time:
+            record_file.writer.close()
+            record_file = None
+        new_file = record_file is None
+        if new_file:
+            record_file = self._open_file(frequency, cid, timestamp)
+            self._files[key] = record_file
+
+        writer = record_file.writer
+        # silence between transmissions is kept as one byte packets, which decoders conceal as silence
+        expected = int((timestamp - record_file.start_time) * opus_default_sample_rate)
+        missing = (expected - writer.granule_position) // self._frame_size - 1
+        if missing > 0:
+            silence = bytes([data[0] & 0xFC])
+            for _ in range(missing):
+                writer.write_packet(silence, self._frame_size)
+        if new_file or timestamp - record_file.last_packet_time > transmission_gap_time:
+            # start every burst of activity on a new page so it can be seeked to directly
+            writer.flush_page()
+            with self._marks_lock:
+                self._marks.setdefault(key, deque(maxlen=256)).append(
+                    (timestamp, record_file.path, writer.bytes_written))
+        writer.write_packet(data, self._frame_size)
+        record_file.last_packet_time = timestamp
+
+    def _flush_files(self) -> None:
+        for record_file in self._files.values():
+            record_file.writer.flush()
+
+    @property
+    def directory(self) -> str:
+        return self._directory
@@ -0,0 +1,46 @@
+from threading import Thread
+
+from PySide6.QtCore import QObject, Signal
+from loguru import logger
+
+from src.signal import AudioSignal
+from src.startup_profiler import startup_profiler
+
+
+class AudioWarmup(QObject):
+    # AudioHandler, ready to be attached to the voice client
+    finished: Signal = Signal(object)
+    failed: Signal = Signal(str)
+
+    def __init__(self, audio_signal: AudioSignal):
+        super().__init__()
+        self._audio_signal = audio_signal
+
+    def start(self) -> None:
+        Thread(target=self._warm_up, daemon=True).start()
+
+    def _warm_up(self) -> None:
+        logger.trace("Warming up audio")
+        devices = None
+        try:
+            with startup_profiler.span("audio_warmup") as span:
+                with startup_profiler.span("audio_imports") as import_span:
+                    # numpy, soxr, opuslib and pyaudio are first imported here, off the GUI thread
+                    from .audio_devices import AudioDeviceRegistry
+                    from .audio_handler import AudioHandler
+                logger.trace(f"Import audio modules cost {import_span.duration:.6f}s")
+                devices = AudioDeviceRegistry()
+                with startup_profiler.span("portaudio_init"):
+                    devices.initialize()
+                devices.moveToThread(self.thread())
+                devices.start()
+                audio = AudioHandler(self._audio_signal, devices)
+        except Exception as e:
+            logger.error(f"Fail to initialize audio, {e}")
+            if devices is not None:
+                # a retry starts from a fresh PortAudio instance
+                devices.terminate()
+            self.failed.emit(str(e))
+            return
+        logger.trace(f"Warm up audio cost {span.duration:.6f}s")
+        self.finished.emit(audio)
@@ -0,0 +1,110 @@
+from struct import pack
+from typing import BinaryIO, Optional
+
+from src.constants import default_channels, opus_default_sample_rate
+
+# libopus look ahead at 48kHz, written into the header so players drop the encoder delay
+opus_pre_skip: int = 312
+max_page_packets: int = 50
+
+
+def _crc_table() -> list[int]:
+    table = []
+    for i in range(256):
+        crc = i << 24
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x04C11DB7) if crc & 0x80000000 else crc << 1
+        table.append(crc & 0xFFFFFFFF)
+    return table
+
+
+_crc_lookup = _crc_table()
+
+
+def ogg_crc(data: bytes) -> int:
+    crc = 0
+    for byte in data:
+        crc = ((crc << 8) & 0xFFFFFFFF) ^ _crc_lookup[(crc >> 24) ^ byte]
+    return crc
+
+
+class OggOpusWriter:
+    def __init__(self,
+                 stream: BinaryIO,
+                 serial: int,
+                 channels: int = default_channels,
+                 comments: Optional[dict[str, str]] = None):
+        self._stream = stream
+        self._serial = serial
+        self._sequence = 0
+        self._granule_position = 0
+        self._bytes_written = 0
+        self._segments = bytearray()
+        self._body = bytearray()
+        self._packet_count = 0
+
+        head = pack("<8sBBHIhB", b"OpusHead", 1, channels, opus_pre_skip, opus_default_sample_rate, 0, 0)
+        self._write_page(head, bytes(self._lacing(len(head))), 0x02, 0)
+
+        vendor = b"AudioClient"
+        tags = bytearray(b"OpusTags")
+        tags.extend(pack("<I", len(vendor)))
+        tags.extend(vendor)
+        comments = comments or {}
+        tags.extend(pack("<I", len(comments)))
+        for key, value in comments.items():
+            comment = f"{key.upper()}={value}".encode("utf-8")
+            tags.extend(pack("<I", len(comment)))
+            tags.extend(comment)
+        self._write_page(bytes(tags), bytes(self._lacing(len(tags))), 0x00, 0)
+
+    @staticmethod
+    def _lacing(length: int) -> bytearray:
+        return bytearray([255] * (length // 255) + [length % 255])
+
+    def _write_page(self, body: bytes, segments: bytes, header_type: int, granule_position: int) -> None:
+        header = pack("<4sBBqIIIB", b"OggS", 0, header_type, granule_position,
+                      self._serial, self._sequence, 0, len(segments))
+        page = bytearray(header)
+        page.extend(segments)
+        page.extend(body)
+        page[22:26] = pack("<I", ogg_crc(page))
+        self._stream.write(page)
+        self._sequence += 1
+        self._bytes_written += len(page)
+
+    def write_packet(self, data: bytes, samples: int) -> None:
+        lacing = self._lacing(len(data))
+        if len(self._segments) + len(lacing) > 255:
+            self.flush_page()
+        self._segments.extend(lacing)
+        self._body.extend(data)
+        self._granule_position += samples
+        self._packet_count += 1
+        if self._packet_count >= max_page_packets:
+            self.flush_page()
+
+    def flush_page(self, end_of_stream: bool = False) -> None:
+        if self._packet_count == 0 and not end_of_stream:
+            return
+        self._write_page(bytes(self._body), bytes(self._segments), 0x04 if end_of_stream else 0x00,
+                         self._granule_position)
+        self._segments.clear()
+        self._body.clear()
+        self._packet_count = 0
+
+    def flush(self) -> None:
+        self.flush_page()
+        self._stream.flush()
+
+    def close(self) -> None:
+        self.flush_page(end_of_stream=True)
+        self._stream.close()
+
+    @property
+    def granule_position(self) -> int:
+        return self._granule_position
+
+    @property
+    def bytes_written(self) -> int:
+        return self._bytes_written
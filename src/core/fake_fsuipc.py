@@ -0,0 +1,104 @@
+from bisect import bisect_right
+from ctypes import pointer
+from json import load
+from threading import Lock
+from time import monotonic
+from typing import Any, Callable, Optional
+
+from .fsuipc_client import CReturnValue, CReturnValuePointer
+
+# keys a timeline event may set, frequencies are in kHz like the rest of the client
+_default_state: dict[str, Any] = {
+    "connected": True,
+    "com1": 122800,
+    "com1_standby": 0,
+    "com1_rx": True,
+    "com2": 121500,
+    "com2_standby": 0,
+    "com2_rx": True,
+}
+
+
+class _FakeFunction:
+    def __init__(self, function: Callable[..., Any]):
+        self._function = function
+        self.restype = None
+        self.argtypes = None
+
+    def __call__(self, *args) -> Any:
+        return self._function(*args)
+
+
+# Stand-in for libfsuipc driven by a scripted timeline, for running the client without a simulator.
+# A timeline is a list of events, each with a "time" in seconds since the library was created and any of the
+# keys in _default_state, later events override earlier ones.
+class FakeFSUIPCLibrary:
+    def __init__(self, events: Optional[list[dict[str, Any]]] = None, loop: bool = False,
+                 duration: Optional[float] = None):
+        events = sorted(events or [], key=lambda event: event.get("time", 0))
+        state = dict(_default_state)
+        self._times: list[float] = [0]
+        self._states: list[dict[str, Any]] = [dict(state)]
+        for event in events:
+            state.update({key: value for key, value in event.items() if key in _default_state})
+            self._times.append(float(event.get("time", 0)))
+            self._states.append(dict(state))
+        self._duration = duration if duration is not None else self._times[-1]
+        self._loop = loop and self._duration > 0
+        self._start_time = monotonic()
+        self._opened = False
+        self._lock = Lock()
+
+        self.OpenFSUIPCClient = _FakeFunction(self._open)
+        self.CloseFSUIPCClient = _FakeFunction(self._close)
+        self.GetConnectionState = _FakeFunction(self._connection_state)
+        self.ReadFrequencyInfo = _FakeFunction(self._read_frequency)
+        self.FreeMemory = _FakeFunction(lambda _: None)
+
+    @classmethod
+    def from_file(cls, path: str) -> "FakeFSUIPCLibrary":
+        with open(path, "r", encoding="utf-8") as file:
+            data = load(file)
+        if isinstance(data, list):
+            return cls(data)
+        return cls(data.get("events", []), data.get("loop", False), data.get("duration"))
+
+    def _current_state(self) -> dict[str, Any]:
+        elapsed = monotonic() - self._start_time
+        if self._loop:
+            elapsed %= self._duration
+        return self._states[bisect_right(self._times, elapsed) - 1]
+
+    @staticmethod
+    def _result(request_status: bool, message: str = "", status: int = 0) -> CReturnValuePointer:
+        return pointer(CReturnValue(request_status, message.encode(), 0, (0, 0, 0, 0), status))
+
+    def _open(self) -> CReturnValuePointer:
+        with self._lock:
+            if not self._current_state()["connected"]:
+                return self._result(False, "Simulator not running")
+            self._opened = True
+            return self._result(True, status=1)
+
+    def _close(self) -> CReturnValuePointer:
+        with self._lock:
+            self._opened = False
+            return self._result(True)
+
+    def _connection_state(self) -> CReturnValuePointer:
+        with self._lock:
+            connected = self._opened and self._current_state()["connected"]
+            return self._result(True, status=int(connected))
+
+    def _read_frequency(self) -> CReturnValuePointer:
+        with self._lock:
+            if not self._opened:
+                return self._result(False, "FSUIPC client not opened")
+            state = self._current_state()
+            if not state["connected"]:
+                self._opened = False
+                return self._result(False, "Simulator connection lost")
+        flag = (0 if state["com1_rx"] else 0x80) | (0 if state["com2_rx"] else 0x40)
+        frequency = (state["com1"] * 1000, state["com1_standby"] * 1000,
+                     state["com2"] * 1000, state["com2_standby"] * 1000)
+        return pointer(CReturnValue(True, b"", flag, frequency, 1))
@@ -0,0 +1,73 @@
+from threading import Event, Thread, current_thread
+from typing import Optional
+
+from PySide6.QtCore import QObject, Signal
+from loguru import logger
+
+from .fsuipc_client import FSUIPCClient
+
+
+class FrequencyWatcher(QObject):
+    # com1 frequency, com2 frequency, com1 receive, com2 receive
+    com_changed = Signal(int, int, bool, bool)
+    connection_lost = Signal()
+
+    def __init__(self, fsuipc_client: FSUIPCClient, poll_interval: int, max_error: int = 3):
+        super().__init__()
+        self._fsuipc_client = fsuipc_client
+        self._poll_interval = poll_interval / 1000
+        self._max_error = max_error
+        self._exit = Event()
+        self._thread: Optional[Thread] = None
+
+    def start(self) -> None:
+        self.stop()
+        self._exit = Event()
+        self._thread = Thread(target=self._watch_loop, args=(self._exit,), daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2) -> None:
+        # callers close the FSUIPC client right after, so the poll in flight has to finish first
+        self._exit.set()
+        thread = self._thread
+        self._thread = None
+        if thread is not None and thread is not current_thread():
+            thread.join(timeout)
+            if thread.is_alive():
+                logger.warning("Frequency watcher did not stop in time")
+
+    def _watch_loop(self, exit_event: Event) -> None:
+        last_state: Optional[tuple[int, int, bool, bool]] = None
+        err_count = 0
+        self._fsuipc_client.reset_frequency_cache()
+        while not exit_event.is_set():
+            res = self._fsuipc_client.poll_frequency()
+            if res is None:
+                err_count = 0
+            elif res.requestStatus:
+                err_count = 0
+                state = (res.frequency[0] // 1000,
+                         res.frequency[2] // 1000,
+                         (res.frequencyFlag & 0x80) != 0x80,
+                         (res.frequencyFlag & 0x40) != 0x40)
+                if state != last_state:
+                    last_state = state
+                    self.com_changed.emit(*state)
+            else:
+                err_count += 1
+                logger.error(f"Error while receiving frequency from FSUIPC: {res.errMessage}")
+                if err_count >= self._max_error:
+                    logger.error(f"Too many error received from FSUIPC: {err_count}, connection lost")
+                    if not exit_event.is_set():
+                        exit_event.set()
+                        self.connection_lost.emit()
+                    return
+            exit_event.wait(self._poll_interval)
+
+    @property
+    def poll_interval(self) -> int:
+        return int(self._poll_interval * 1000)
+
+    @poll_interval.setter
+    def poll_interval(self, poll_interval: int) -> None:
+        self._poll_interval = poll_interval / 1000
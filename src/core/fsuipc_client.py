@@ -1,5 +1,7 @@
-from ctypes import POINTER, Structure, c_bool, c_char_p, c_int32, cdll, c_uint8
-from dataclasses import dataclass
+from ctypes import (CDLL, POINTER, Structure, addressof, c_bool, c_char_p, c_int, c_int32, c_size_t, c_uint8,
+                    c_void_p, cdll, memmove, sizeof)
+from sys import platform
+from typing import Any, Callable, Optional, Union
 
 
 class CReturnValue(Structure):
@@ -12,52 +14,123 @@ class CReturnValue(Structure):
     ]
 
 
-@dataclass
+# frequency and status are laid out back to back, compared as one block of raw bytes
+_state_offset = CReturnValue.frequency.offset
+_state_size = CReturnValue.status.offset + sizeof(c_int32) - _state_offset
+CReturnValuePointer = POINTER(CReturnValue)
+
+_memcmp = (cdll.msvcrt if platform == "win32" else CDLL(None)).memcmp
+_memcmp.argtypes = [c_void_p, c_void_p, c_size_t]
+_memcmp.restype = c_int
+
+
 class ReturnValue:
-    requestStatus: bool
-    errMessage: str
-    frequencyFlag: int
-    frequency: list[int]
-    status: int
+    __slots__ = ("requestStatus", "frequencyFlag", "frequency", "status", "_err_message", "_decoded_message")
+
+    def __init__(self,
+                 requestStatus: bool = False,
+                 errMessage: Optional[bytes] = None,
+                 frequencyFlag: int = 0,
+                 frequency: Optional[list[int]] = None,
+                 status: int = 0):
+        self.requestStatus = requestStatus
+        self.frequencyFlag = frequencyFlag
+        self.frequency = [0] * 4 if frequency is None else frequency
+        self.status = status
+        self._err_message = errMessage
+        self._decoded_message: Optional[str] = None
+
+    def _load(self, contents: CReturnValue) -> None:
+        self.requestStatus = contents.requestStatus
+        # the message is only meaningful on failure, so skip copying it out of the C string otherwise
+        self._err_message = None if self.requestStatus else contents.errMessage
+        self._decoded_message = None
+        self.frequencyFlag = contents.frequencyFlag
+        self.frequency[:] = contents.frequency
+        self.status = contents.status
+
+    @property
+    def errMessage(self) -> str:
+        if self._decoded_message is None:
+            self._decoded_message = self._err_message.decode(errors="replace") if self._err_message else ""
+        return self._decoded_message
+
+    def __repr__(self) -> str:
+        return (f"ReturnValue(requestStatus={self.requestStatus}, errMessage={self.errMessage!r}, "
+                f"frequencyFlag={self.frequencyFlag}, frequency={self.frequency}, status={self.status})")
 
 
 class FSUIPCClient:
-    def __init__(self, fsuipc_lib_path: str) -> None:
-        fsuipc_lib = cdll.LoadLibrary(fsuipc_lib_path)
-        fsuipc_lib.OpenFSUIPCClient.restype = POINTER(CReturnValue)
-        fsuipc_lib.ReadFrequencyInfo.restype = POINTER(CReturnValue)
-        fsuipc_lib.CloseFSUIPCClient.restype = POINTER(CReturnValue)
-        fsuipc_lib.GetConnectionState.restype = POINTER(CReturnValue)
-        fsuipc_lib.FreeMemory.argtypes = [POINTER(CReturnValue)]
-        fsuipc_lib.FreeMemory.restype = None
+    # takes either the path of libfsuipc or an already loaded library such as FakeFSUIPCLibrary
+    def __init__(self, fsuipc_lib: Union[str, Any]) -> None:
+        if isinstance(fsuipc_lib, str):
+            fsuipc_lib = cdll.LoadLibrary(fsuipc_lib)
+        # libfsuipc exports nothing beyond these calls, aircraft position or raw offsets cannot be read
+        self._open_client = self._bind(fsuipc_lib, "OpenFSUIPCClient")
+        self._read_frequency = self._bind(fsuipc_lib, "ReadFrequencyInfo")
+        self._close_client = self._bind(fsuipc_lib, "CloseFSUIPCClient")
+        self._connection_state = self._bind(fsuipc_lib, "GetConnectionState")
+        free_memory = getattr(fsuipc_lib, "FreeMemory")
+        free_memory.argtypes = [CReturnValuePointer]
+        free_memory.restype = None
+        self._free_memory = free_memory
         self._fsuipc_lib = fsuipc_lib
+        self._frequency_result = ReturnValue()
+        self._last_flag = -1
+        self._last_state = (c_uint8 * _state_size)()
+
+    @staticmethod
+    def _bind(fsuipc_lib, function_name: str) -> Callable[[], CReturnValuePointer]:
+        if not hasattr(fsuipc_lib, function_name):
+            raise AttributeError(f"Function {function_name} not available")
+        function = getattr(fsuipc_lib, function_name)
+        function.restype = CReturnValuePointer
+        return function
 
     def open_fsuipc_client(self) -> ReturnValue:
-        return self._call_function("OpenFSUIPCClient")
+        self.reset_frequency_cache()
+        return self._call_function(self._open_client)
 
     def close_fsuipc_client(self) -> ReturnValue:
-        return self._call_function("CloseFSUIPCClient")
+        return self._call_function(self._close_client)
 
     def get_connection_state(self) -> ReturnValue:
-        return self._call_function("GetConnectionState")
+        return self._call_function(self._connection_state)
 
     def get_frequency(self) -> ReturnValue:
-        return self._call_function("ReadFrequencyInfo")
+        return self._call_function(self._read_frequency)
 
-    def _call_function(self, function_name: str) -> ReturnValue:
-        if not hasattr(self._fsuipc_lib, function_name):
-            raise AttributeError(f"Function {function_name} not available")
-        function = getattr(self._fsuipc_lib, function_name)
+    # returns None if nothing changed since the last poll,
+    # the returned value is reused by the next call, copy anything that has to outlive it
+    def poll_frequency(self) -> Optional[ReturnValue]:
+        function_return = self._read_frequency()
+        try:
+            contents = function_return.contents
+            if not contents.requestStatus:
+                self.reset_frequency_cache()
+                result = ReturnValue()
+                result._load(contents)
+                return result
+            # compared in place against the last state, nothing is allocated when the poll sees no change
+            state = addressof(contents) + _state_offset
+            if contents.frequencyFlag == self._last_flag and _memcmp(state, self._last_state, _state_size) == 0:
+                return None
+            self._last_flag = contents.frequencyFlag
+            memmove(self._last_state, state, _state_size)
+            self._frequency_result._load(contents)
+            return self._frequency_result
+        finally:
+            self._free_memory(function_return)
+
+    # no flag byte equals -1, so the next poll reports a change whatever the stored state holds
+    def reset_frequency_cache(self) -> None:
+        self._last_flag = -1
+
+    def _call_function(self, function: Callable[[], CReturnValuePointer]) -> ReturnValue:
         function_return = function()
         try:
-            result = ReturnValue(function_return.contents.requestStatus,
-                                 function_return.contents.errMessage.decode(),
-                                 function_return.contents.frequencyFlag,
-                                 function_return.contents.frequency[:],
-                                 function_return.contents.status)
+            result = ReturnValue()
+            result._load(function_return.contents)
         finally:
             self._free_memory(function_return)
         return result
-
-    def _free_memory(self, pointer) -> None:
-        self._fsuipc_lib.FreeMemory(pointer)
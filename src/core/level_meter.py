@@ -0,0 +1,57 @@
+from time import monotonic
+
+from numpy import abs as np_abs, dot, empty, float32, multiply, ndarray
+
+from src.constants import default_frame_size, default_frame_time, level_meter_interval
+
+_silence: tuple[float, float, float] = (0.0, 0.0, 0.0)
+
+
+class LevelMeter:
+    # levels older than this are reported as silence, e.g. after a stream stopped
+    stale_time: float = 0.25
+
+    def __init__(self, full_scale: float = 1.0, frame_time: int = default_frame_time,
+                 interval: int = level_meter_interval):
+        self._scale = 1.0 / full_scale
+        self._frames_per_update = max(1, interval // frame_time)
+        self._buffer = empty(default_frame_size * 2, dtype=float32)
+        self._frames = 0
+        self._samples = 0
+        self._square_sum = 0.0
+        self._peak = 0.0
+        # rms, peak, publish time, replaced as a whole so readers never need a lock
+        self._level = _silence
+
+    def process(self, audio_data: ndarray) -> None:
+        size = audio_data.size
+        if size == 0:
+            return
+        if size > self._buffer.size:
+            self._buffer = empty(size, dtype=float32)
+        buffer = self._buffer[:size]
+        multiply(audio_data, self._scale, out=buffer, casting="unsafe")
+        self._square_sum += float(dot(buffer, buffer))
+        np_abs(buffer, out=buffer)
+        peak = float(buffer.max())
+        if peak > self._peak:
+            self._peak = peak
+        self._samples += size
+        self._frames += 1
+        if self._frames >= self._frames_per_update:
+            self._level = ((self._square_sum / self._samples) ** 0.5, self._peak, monotonic())
+            self._frames = 0
+            self._samples = 0
+            self._square_sum = 0.0
+            self._peak = 0.0
+
+    def reset(self) -> None:
+        self._level = _silence
+
+    # linear rms and peak in 0..1
+    @property
+    def level(self) -> tuple[float, float]:
+        rms, peak, publish_time = self._level
+        if monotonic() - publish_time > self.stale_time:
+            return 0.0, 0.0
+        return rms, peak
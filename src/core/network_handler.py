@@ -1,14 +1,23 @@
 import json
 from socket import AF_INET, SOCK_DGRAM, SOCK_STREAM, socket
-from struct import unpack
 from threading import Thread
 from typing import Optional
 
 from PySide6.QtCore import QObject, Signal
 from loguru import logger
 
-from src.model.voice_models import ControlMessage, MessageType, VoicePacket
+from src.model.voice_models import ControlMessage, VoicePacket, VoicePacketBuilder
 from src.signal import Signals
+from src.utils.metrics import metrics
+from .packet_capture import PacketCaptureWriter, ReplayResult, capture_tcp, capture_udp, replay_capture
+
+_udp_received_packets = metrics.counter("network_udp_received_packets_total", "Voice packets received")
+_udp_received_bytes = metrics.counter("network_udp_received_bytes_total", "Voice bytes received")
+_udp_sent_packets = metrics.counter("network_udp_sent_packets_total", "Voice packets sent")
+_udp_sent_bytes = metrics.counter("network_udp_sent_bytes_total", "Voice bytes sent")
+_udp_send_errors = metrics.counter("network_udp_send_errors_total", "Voice packets that failed to send")
+_tcp_received_bytes = metrics.counter("network_tcp_received_bytes_total", "Control bytes received")
+_malformed_packets = metrics.counter("network_malformed_packets_total", "Voice packets that failed to parse")
 
 
 class NetworkHandler(QObject):
@@ -33,6 +42,8 @@ class NetworkHandler(QObject):
         self._cid: Optional[int] = None
         self._callsign: Optional[str] = None
 
+        self._capture: Optional[PacketCaptureWriter] = None
+
     def _log_message(self, level: str, message: str):
         self._signals.log_message.emit("Network", level, message)
 
@@ -88,7 +99,10 @@ class NetworkHandler(QObject):
 
         try:
             self._udp_socket.sendto(packet, self._server_address)
+            _udp_sent_packets.inc()
+            _udp_sent_bytes.inc(len(packet))
         except Exception as e:
+            _udp_send_errors.inc()
             logger.error(f"Failed to send voice packet: {e}")
 
     def _tcp_receive_loop(self):
@@ -98,6 +112,9 @@ class NetworkHandler(QObject):
                 if not data:
                     break
                 logger.trace(f"TCP receive from server: {data}")
+                _tcp_received_bytes.inc(len(data))
+                if self._capture is not None:
+                    self._capture.write(capture_tcp, data)
                 self._process_control_message(data.decode())
             except Exception as e:
                 if self._tcp_running:
@@ -109,6 +126,10 @@ class NetworkHandler(QObject):
         while self._udp_running and self._udp_socket:
             try:
                 data, addr = self._udp_socket.recvfrom(65507)
+                _udp_received_packets.inc()
+                _udp_received_bytes.inc(len(data))
+                if self._capture is not None:
+                    self._capture.write(capture_udp, data)
                 self._process_voice_packet(data)
             except Exception as e:
                 if self._udp_running:
@@ -117,38 +138,42 @@ class NetworkHandler(QObject):
 
     def _process_control_message(self, data: str):
         try:
-            message_dict = json.loads(data)
-            message = ControlMessage(
-                type=MessageType(message_dict.get('type')),
-                cid=message_dict.get('cid', 0),
-                callsign=message_dict.get('callsign', ''),
-                transmitter=message_dict.get('transmitter', 0),
-                data=message_dict.get('data', '')
-            )
+            message = ControlMessage.from_dict(json.loads(data))
             self.control_message_received.emit(message)
         except Exception as e:
             logger.error(f"Failed to process control message: {e}")
 
     def _process_voice_packet(self, data: bytes):
         try:
-            if len(data) < 10 or data[-1] != 0x0A:
-                return
-            cid = unpack('<i', data[0:4])[0]
-            transmitter = unpack('<b', data[4:5])[0]
-            frequency = unpack('<i', data[5:9])[0] + 100000
-            callsign_len = data[9]
-            if 9 + callsign_len > len(data) - 1:
+            packet = VoicePacketBuilder.parse_packet(data)
+            if packet is None:
+                _malformed_packets.inc()
                 return
-            callsign = data[10:10 + callsign_len].decode("utf-8")
-            audio_data = data[10 + callsign_len:-1]
-            logger.trace(
-                f"Received from {callsign} (CID={cid}, Frequency={frequency}), audio length: {len(audio_data)}")
-            packet = VoicePacket(cid, transmitter, frequency, callsign, audio_data)
+            logger.trace(f"Received from {packet.callsign} (CID={packet.cid}, Frequency={packet.frequency}), "
+                         f"audio length: {len(packet.data)}")
             self.voice_packet_received.emit(packet)
         except Exception as e:
+            _malformed_packets.inc()
             logger.error(f"Failed to process voice packet: {e}")
 
+    def start_capture(self, path: str):
+        self.stop_capture()
+        self._capture = PacketCaptureWriter(path)
+        self._log_message("INFO", f"Capturing packets to {path}")
+
+    def stop_capture(self):
+        capture = self._capture
+        self._capture = None
+        if capture is not None:
+            capture.close()
+            logger.info(f"Packet capture saved to {capture.path}")
+
+    def replay_capture(self, path: str, realtime: bool = True) -> ReplayResult:
+        return replay_capture(path, self._process_voice_packet,
+                              lambda data: self._process_control_message(data.decode()), realtime)
+
     def cleanup(self):
+        self.stop_capture()
         self._tcp_running = False
         self._udp_running = False
         self._is_connected = False
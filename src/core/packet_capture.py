@@ -0,0 +1,93 @@
+from dataclasses import dataclass
+from struct import Struct
+from threading import Lock
+from time import monotonic, sleep
+from typing import BinaryIO, Callable, Iterator, Optional
+
+capture_magic: bytes = b"ACCAP\x01"
+capture_udp: int = 0
+capture_tcp: int = 1
+
+# kind, monotonic timestamp, payload length
+_record_header = Struct("<BdI")
+
+
+@dataclass
+class ReplayResult:
+    voice_packets: int = 0
+    control_messages: int = 0
+    bytes: int = 0
+    capture_duration: float = 0
+    elapsed: float = 0
+
+    @property
+    def packets_per_second(self) -> float:
+        if self.elapsed <= 0:
+            return 0
+        return (self.voice_packets + self.control_messages) / self.elapsed
+
+
+class PacketCaptureWriter:
+    def __init__(self, path: str):
+        self._path = path
+        self._file: BinaryIO = open(path, "wb")
+        self._file.write(capture_magic)
+        self._lock = Lock()
+
+    def write(self, kind: int, data: bytes) -> None:
+        header = _record_header.pack(kind, monotonic(), len(data))
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write(header)
+            self._file.write(data)
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+
+def read_capture(path: str) -> Iterator[tuple[int, float, bytes]]:
+    with open(path, "rb") as file:
+        if file.read(len(capture_magic)) != capture_magic:
+            raise ValueError(f"{path} is not a packet capture")
+        while True:
+            header = file.read(_record_header.size)
+            if len(header) < _record_header.size:
+                return
+            kind, timestamp, length = _record_header.unpack(header)
+            data = file.read(length)
+            if len(data) < length:
+                return
+            yield kind, timestamp, data
+
+
+def replay_capture(path: str,
+                   voice_handler: Callable[[bytes], None],
+                   control_handler: Callable[[bytes], None],
+                   realtime: bool = True) -> ReplayResult:
+    result = ReplayResult()
+    start_time = monotonic()
+    first_timestamp: Optional[float] = None
+    for kind, timestamp, data in read_capture(path):
+        if first_timestamp is None:
+            first_timestamp = timestamp
+        offset = timestamp - first_timestamp
+        if realtime:
+            delay = offset - (monotonic() - start_time)
+            if delay > 0:
+                sleep(delay)
+        if kind == capture_udp:
+            voice_handler(data)
+            result.voice_packets += 1
+        elif kind == capture_tcp:
+            control_handler(data)
+            result.control_messages += 1
+        result.bytes += len(data)
+        result.capture_duration = offset
+    result.elapsed = monotonic() - start_time
+    return result
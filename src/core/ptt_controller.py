@@ -0,0 +1,68 @@
+from dataclasses import dataclass
+from threading import Lock
+from typing import Callable, Hashable, Optional
+
+from src.signal import AudioSignal
+
+
+@dataclass(frozen=True)
+class PTTTarget:
+    # ptt_binding_transmitter or ptt_binding_frequency
+    type: str
+    # transmitter index or frequency in kHz
+    value: int
+
+
+class PTTController:
+    def __init__(self,
+                 ptt_callback: Callable[[bool], None],
+                 select_callback: Callable[[PTTTarget], bool],
+                 audio_signal: AudioSignal):
+        self._ptt_callback = ptt_callback
+        self._select_callback = select_callback
+        self._audio_signal = audio_signal
+        # None keys the currently selected transmitter
+        self._bindings: dict[Hashable, Optional[PTTTarget]] = {}
+        self._pressed_keys: set[Hashable] = set()
+        self._ptt_active = False
+        self._lock = Lock()
+
+    def set_bindings(self, bindings: dict[Hashable, Optional[PTTTarget]]) -> None:
+        with self._lock:
+            self._bindings = dict(bindings)
+            self._pressed_keys.clear()
+            if self._ptt_active:
+                self._set_ptt_state(False)
+
+    def key_pressed(self, key: Hashable) -> bool:
+        if key not in self._bindings:
+            return False
+        target = self._bindings[key]
+        with self._lock:
+            if key in self._pressed_keys:
+                return True
+            if target is not None and not self._select_callback(target):
+                return True
+            self._pressed_keys.add(key)
+            if not self._ptt_active:
+                self._set_ptt_state(True)
+        return True
+
+    def key_released(self, key: Hashable) -> bool:
+        if key not in self._bindings:
+            return False
+        with self._lock:
+            self._pressed_keys.discard(key)
+            if self._ptt_active and not self._pressed_keys:
+                self._set_ptt_state(False)
+        return True
+
+    def _set_ptt_state(self, active: bool) -> None:
+        # flip the audio engine first, the ui is only notified afterwards through a queued signal
+        self._ptt_active = active
+        self._ptt_callback(active)
+        self._audio_signal.ptt_status_change.emit(active)
+
+    @property
+    def ptt_active(self) -> bool:
+        return self._ptt_active
@@ -0,0 +1,95 @@
+from collections import deque
+from dataclasses import dataclass, field
+from threading import Lock
+from time import time
+from typing import Optional
+
+from src.constants import transmission_gap_time
+from src.model.voice_models import VoicePacket
+
+
+@dataclass
+class Transmission:
+    cid: int
+    callsign: str
+    frequency: int
+    start_time: float
+    end_time: float
+    packets: list[bytes] = field(default_factory=list)
+
+    @property
+    def duration(self) -> float:
+        return self.end_time - self.start_time
+
+
+class ReplayBuffer:
+    def __init__(self, duration: float, gap_time: float = transmission_gap_time):
+        self._duration = duration
+        self._gap_time = gap_time
+        self._by_frequency: dict[int, deque[Transmission]] = {}
+        self._by_speaker: dict[int, deque[Transmission]] = {}
+        self._active: dict[tuple[int, int], Transmission] = {}
+        self._lock = Lock()
+
+    def add_packet(self, packet: VoicePacket, timestamp: float) -> None:
+        if not packet.data:
+            return
+        key = (packet.cid, packet.frequency)
+        with self._lock:
+            transmission = self._active.get(key)
+            if transmission is None or timestamp - transmission.end_time > self._gap_time:
+                transmission = Transmission(packet.cid, packet.callsign, packet.frequency, timestamp, timestamp)
+                self._active[key] = transmission
+                self._by_frequency.setdefault(packet.frequency, deque()).append(transmission)
+                self._by_speaker.setdefault(packet.cid, deque()).append(transmission)
+                self._evict(timestamp)
+            transmission.packets.append(packet.data)
+            transmission.end_time = timestamp
+
+    def _evict(self, timestamp: float) -> None:
+        expire_time = timestamp - self._duration
+        for index in (self._by_frequency, self._by_speaker):
+            for index_key, transmissions in list(index.items()):
+                while transmissions and transmissions[0].end_time < expire_time:
+                    expired = transmissions.popleft()
+                    key = (expired.cid, expired.frequency)
+                    if self._active.get(key) is expired:
+                        del self._active[key]
+                # keys of frequencies and speakers no longer heard are dropped with their last transmission
+                if not transmissions:
+                    del index[index_key]
+
+    def _select(self, frequency: Optional[int], cid: Optional[int]) -> list[Transmission]:
+        if frequency is not None:
+            source = self._by_frequency.get(frequency, ())
+        elif cid is not None:
+            source = self._by_speaker.get(cid, ())
+        else:
+            source = [item for transmissions in self._by_frequency.values() for item in transmissions]
+        return [item for item in source if cid is None or item.cid == cid]
+
+    @staticmethod
+    def _copy(transmission: Transmission) -> Transmission:
+        return Transmission(transmission.cid, transmission.callsign, transmission.frequency,
+                            transmission.start_time, transmission.end_time, list(transmission.packets))
+
+    def transmissions(self, frequency: Optional[int] = None, cid: Optional[int] = None) -> list[Transmission]:
+        with self._lock:
+            self._evict(time())
+            result = [self._copy(item) for item in self._select(frequency, cid)]
+        result.sort(key=lambda item: item.start_time)
+        return result
+
+    def last_transmission(self, frequency: Optional[int] = None, cid: Optional[int] = None) -> Optional[Transmission]:
+        with self._lock:
+            self._evict(time())
+            selected = self._select(frequency, cid)
+            if not selected:
+                return None
+            return self._copy(max(selected, key=lambda item: item.start_time))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._by_frequency.clear()
+            self._by_speaker.clear()
+            self._active.clear()
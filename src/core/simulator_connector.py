@@ -0,0 +1,95 @@
+from threading import Event, Thread
+from time import monotonic
+from typing import Optional
+
+from PySide6.QtCore import QObject, Signal
+from loguru import logger
+
+from src.constants import simulator_connect_timeout, simulator_retry_initial_delay, simulator_retry_max_delay
+from .fsuipc_client import FSUIPCClient
+
+
+class SimulatorConnector(QObject):
+    connected = Signal()
+    connect_failed = Signal()
+    # level, message
+    status_message = Signal(str, str)
+    # generation, success
+    _attempt_finished = Signal(int, bool)
+
+    def __init__(self,
+                 fsuipc_client: FSUIPCClient,
+                 initial_delay: float = simulator_retry_initial_delay,
+                 max_delay: float = simulator_retry_max_delay):
+        super().__init__()
+        self._fsuipc_client = fsuipc_client
+        self._initial_delay = initial_delay
+        self._max_delay = max_delay
+        self._cancel = Event()
+        self._generation = 0
+        self._thread: Optional[Thread] = None
+        self._attempt_finished.connect(self._finish)
+
+    # timeout None keeps retrying until cancelled
+    def start(self, timeout: Optional[float] = simulator_connect_timeout) -> None:
+        self.cancel()
+        # attempts never overlap, the cancelled one returns as soon as its current libfsuipc call does
+        if self._thread is not None:
+            self._thread.join()
+        self._cancel = Event()
+        self._generation += 1
+        self._thread = Thread(target=self._connect_loop, args=(self._cancel, self._generation, timeout), daemon=True)
+        self._thread.start()
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    @property
+    def connecting(self) -> bool:
+        return not self._cancel.is_set()
+
+    def _connect_loop(self, cancel: Event, generation: int, timeout: Optional[float]) -> None:
+        deadline = None if timeout is None else monotonic() + timeout
+        delay = self._initial_delay
+        attempt = 0
+        while not cancel.is_set():
+            state = self._fsuipc_client.get_connection_state()
+            if state.requestStatus and state.status:
+                logger.success("FSUIPC already connected")
+                self.status_message.emit("INFO", "FSUIPC已连接")
+                self._attempt_finished.emit(generation, True)
+                return
+            res = self._fsuipc_client.open_fsuipc_client()
+            if res.requestStatus:
+                logger.success("FSUIPC connection established")
+                self.status_message.emit("INFO", "FSUIPC连接成功")
+                self._attempt_finished.emit(generation, True)
+                return
+            attempt += 1
+            if deadline is not None and monotonic() + delay > deadline:
+                break
+            logger.error(f"FSUIPC connection failed, {res.errMessage}, attempt {attempt}, retry in {delay:.2f}s")
+            self.status_message.emit("ERROR", f"FSUIPC连接失败, 第 {attempt} 次尝试, {delay:.2f}秒后重试")
+            if cancel.wait(delay):
+                return
+            delay = min(delay * 2, self._max_delay)
+        if cancel.is_set():
+            return
+        logger.error("FSUIPC connection failed")
+        self.status_message.emit("ERROR", "FSUIPC连接失败")
+        self._attempt_finished.emit(generation, False)
+
+    def _finish(self, generation: int, success: bool) -> None:
+        # runs on the thread owning the connector, drop results of attempts that were cancelled or replaced
+        if generation != self._generation:
+            # a newer attempt owns the client now and picks up an open connection as already connected
+            return
+        if self._cancel.is_set():
+            if success:
+                self._fsuipc_client.close_fsuipc_client()
+            return
+        self._cancel.set()
+        if success:
+            self.connected.emit()
+        else:
+            self.connect_failed.emit()
@@ -0,0 +1,110 @@
+from dataclasses import dataclass
+from threading import Condition, Thread
+from time import monotonic
+from typing import Optional
+
+from PySide6.QtCore import QObject, Signal
+
+from src.constants import transmission_gap_time
+
+
+@dataclass(frozen=True)
+class TalkStream:
+    sent: bool
+    cid: int
+    callsign: str
+    frequency: int
+
+
+@dataclass(frozen=True)
+class ActiveTalk:
+    stream: TalkStream
+    start_time: float
+    last_seen: float
+
+    @property
+    def duration(self) -> float:
+        return self.last_seen - self.start_time
+
+
+class TalkStateTracker(QObject):
+    talk_started = Signal(TalkStream)
+    talk_stopped = Signal(TalkStream)
+
+    def __init__(self, timeout: float = transmission_gap_time):
+        super().__init__()
+        self._timeout = timeout
+        # stream, start time, last seen
+        self._last_seen: dict[tuple[bool, int, int], tuple[TalkStream, float, float]] = {}
+        self._condition = Condition()
+        self._running = False
+        self._thread: Optional[Thread] = None
+
+    def start(self) -> None:
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+        self._thread = Thread(target=self._expire_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.clear()
+
+    # called for every voice packet, only the first packet of a stream emits anything
+    def packet(self, sent: bool, cid: int, callsign: str, frequency: int) -> None:
+        key = (sent, cid, frequency)
+        now = monotonic()
+        with self._condition:
+            entry = self._last_seen.get(key)
+            if entry is not None:
+                self._last_seen[key] = (entry[0], entry[1], now)
+                return
+            stream = TalkStream(sent, cid, callsign, frequency)
+            self._last_seen[key] = (stream, now, now)
+            if len(self._last_seen) == 1:
+                self._condition.notify()
+        self.talk_started.emit(stream)
+
+    def clear(self) -> None:
+        with self._condition:
+            streams = [entry[0] for entry in self._last_seen.values()]
+            self._last_seen.clear()
+        for stream in streams:
+            self.talk_stopped.emit(stream)
+
+    def _expire_loop(self) -> None:
+        while True:
+            with self._condition:
+                if not self._running:
+                    return
+                if not self._last_seen:
+                    # nothing to time out, sleep until the next stream starts
+                    self._condition.wait()
+                    continue
+                now = monotonic()
+                expired = [key for key, entry in self._last_seen.items() if now - entry[2] >= self._timeout]
+                streams = [self._last_seen.pop(key)[0] for key in expired]
+                if not streams:
+                    oldest = min(entry[2] for entry in self._last_seen.values())
+                    self._condition.wait(oldest + self._timeout - now)
+                    continue
+            for stream in streams:
+                self.talk_stopped.emit(stream)
+
+    @property
+    def active_streams(self) -> list[TalkStream]:
+        with self._condition:
+            return [entry[0] for entry in self._last_seen.values()]
+
+    # everyone currently talking, oldest first, None for both directions
+    def snapshot(self, sent: Optional[bool] = None) -> list[ActiveTalk]:
+        with self._condition:
+            entries = [entry for entry in self._last_seen.values() if sent is None or entry[0].sent == sent]
+        return sorted((ActiveTalk(*entry) for entry in entries), key=lambda talk: talk.start_time)
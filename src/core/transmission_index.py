@@ -0,0 +1,176 @@
+import sqlite3
+from dataclasses import dataclass
+from os.path import dirname
+from queue import Empty, Queue
+from threading import Thread
+from time import time
+from typing import Optional
+
+from loguru import logger
+
+from src.constants import transmission_gap_time
+from src.utils.file_utils import check_directory
+from .audio_recorder import AudioRecorder
+
+_schema = """
+CREATE TABLE IF NOT EXISTS transmissions (
+    id INTEGER PRIMARY KEY,
+    sent INTEGER NOT NULL,
+    start_time REAL NOT NULL,
+    end_time REAL NOT NULL,
+    cid INTEGER NOT NULL,
+    callsign TEXT NOT NULL,
+    frequency INTEGER NOT NULL,
+    transmitter INTEGER NOT NULL,
+    file TEXT,
+    byte_offset INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_transmissions_start_time ON transmissions (start_time);
+CREATE INDEX IF NOT EXISTS idx_transmissions_callsign ON transmissions (callsign, start_time);
+CREATE INDEX IF NOT EXISTS idx_transmissions_frequency ON transmissions (frequency, start_time);
+"""
+
+
+@dataclass
+class TransmissionRecord:
+    sent: bool
+    start_time: float
+    end_time: float
+    cid: int
+    callsign: str
+    frequency: int
+    transmitter: int
+    file: Optional[str] = None
+    byte_offset: Optional[int] = None
+
+
+class TransmissionIndex:
+    def __init__(self,
+                 path: str,
+                 recorder: Optional[AudioRecorder] = None,
+                 gap_time: float = transmission_gap_time,
+                 batch_size: int = 100,
+                 flush_interval: float = 1.0):
+        self._path = path
+        self._recorder = recorder
+        self._gap_time = gap_time
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._queue: Queue[Optional[tuple[bool, int, str, int, int, float]]] = Queue()
+        self._thread: Optional[Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        directory = dirname(self._path)
+        if directory:
+            check_directory(directory, create_if_not_exist=True)
+        self._thread = Thread(target=self._index_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+    def add_packet(self, sent: bool, cid: int, callsign: str, frequency: int, transmitter: int,
+                   timestamp: float) -> None:
+        if self._thread is None:
+            return
+        self._queue.put_nowait((sent, cid, callsign, frequency, transmitter, timestamp))
+
+    def _index_loop(self) -> None:
+        connection = sqlite3.connect(self._path)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.executescript(_schema)
+        active: dict[tuple[bool, int, int], TransmissionRecord] = {}
+        pending: list[TransmissionRecord] = []
+        last_flush = 0.0
+        running = True
+        while running:
+            try:
+                item = self._queue.get(timeout=self._gap_time if active or pending else None)
+            except Empty:
+                item = ()
+            now = time()
+            if item is None:
+                running = False
+            elif item:
+                sent, cid, callsign, frequency, transmitter, timestamp = item
+                now = timestamp
+                key = (sent, cid, frequency)
+                record = active.get(key)
+                if record is not None and timestamp - record.end_time > self._gap_time:
+                    pending.append(active.pop(key))
+                    record = None
+                if record is None:
+                    active[key] = TransmissionRecord(sent, timestamp, timestamp, cid, callsign, frequency, transmitter)
+                else:
+                    record.end_time = timestamp
+
+            for key in [key for key, record in active.items() if not running or now - record.end_time > self._gap_time]:
+                pending.append(active.pop(key))
+            if pending and (not running or len(pending) >= self._batch_size or now - last_flush >= self._flush_interval):
+                self._flush(connection, pending)
+                pending.clear()
+                last_flush = now
+        connection.close()
+
+    def _flush(self, connection: sqlite3.Connection, records: list[TransmissionRecord]) -> None:
+        if self._recorder is not None:
+            # the recorder marks the first packet of a burst with the same timestamp the index got,
+            # so once its queue is drained the lookup no longer depends on thread timing
+            self._recorder.sync()
+            for record in records:
+                location = self._recorder.locate(record.frequency, record.cid, record.start_time)
+                if location is not None:
+                    record.file, record.byte_offset = location
+        try:
+            with connection:
+                connection.executemany(
+                    "INSERT INTO transmissions (sent, start_time, end_time, cid, callsign, frequency, transmitter, "
+                    "file, byte_offset) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(record.sent, record.start_time, record.end_time, record.cid, record.callsign, record.frequency,
+                      record.transmitter, record.file, record.byte_offset) for record in records]
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Failed to write transmission index: {e}")
+
+    def query(self,
+              callsign: Optional[str] = None,
+              frequency: Optional[int] = None,
+              start_time: Optional[float] = None,
+              end_time: Optional[float] = None,
+              limit: int = 1000) -> list[TransmissionRecord]:
+        conditions = []
+        parameters = []
+        if callsign is not None:
+            conditions.append("callsign = ?")
+            parameters.append(callsign)
+        if frequency is not None:
+            conditions.append("frequency = ?")
+            parameters.append(frequency)
+        if start_time is not None:
+            conditions.append("start_time >= ?")
+            parameters.append(start_time)
+        if end_time is not None:
+            conditions.append("start_time <= ?")
+            parameters.append(end_time)
+        sql = ("SELECT sent, start_time, end_time, cid, callsign, frequency, transmitter, file, byte_offset "
+               "FROM transmissions")
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY start_time LIMIT ?"
+        parameters.append(limit)
+        connection = sqlite3.connect(self._path)
+        try:
+            return [TransmissionRecord(bool(row[0]), *row[1:]) for row in connection.execute(sql, parameters)]
+        finally:
+            connection.close()
+
+    @property
+    def path(self) -> str:
+        return self._path
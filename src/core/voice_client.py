@@ -1,13 +1,34 @@
 import time
-from typing import Optional
+from datetime import datetime
+from os.path import join
+from typing import Optional, TYPE_CHECKING
 
-from PySide6.QtCore import QObject, QTimer, Signal
+from PySide6.QtCore import QObject, Qt, QTimer, Signal
 from loguru import logger
 
+from src.config import config
+from src.constants import ptt_binding_transmitter, transmission_gap_time, transmission_index_file
+from src.utils.file_utils import check_directory
 from src.model.voice_models import ConnectionState, ControlMessage, MessageType, VoicePacket, VoicePacketBuilder
 from src.signal import AudioSignal, Signals
-from .audio_handler import AudioHandler
+from src.utils.metrics import metrics
+from .audio_recorder import AudioRecorder
 from .network_handler import NetworkHandler
+from .ptt_controller import PTTController, PTTTarget
+from .replay_buffer import ReplayBuffer, Transmission
+from .talk_state import TalkStateTracker, TalkStream
+from .transmission_index import TransmissionIndex
+
+if TYPE_CHECKING:
+    from .audio_handler import AudioHandler
+    from .level_meter import LevelMeter
+
+_round_trip_time = metrics.histogram("network_rtt_seconds", "Control connection ping round trip time")
+_packet_interval = metrics.histogram("voice_packet_interval_seconds",
+                                     "Time between consecutive packets of a transmission, spread shows jitter",
+                                     (0.002, 0.005, 0.008, 0.01, 0.012, 0.015, 0.02, 0.03, 0.05, 0.1, 0.2))
+_received_packets = metrics.counter("voice_received_packets_total", "Voice packets accepted for playback")
+_sent_frames = metrics.counter("voice_sent_frames_total", "Encoded frames sent, once per frame")
 
 
 class VoiceClient(QObject):
@@ -16,24 +37,47 @@ class VoiceClient(QObject):
     voice_data_received = Signal(VoicePacket)
     voice_data_sent = Signal()
     error_occurred = Signal(str)
-    update_current_frequency = Signal(int)
-
-    def __init__(self, signals: Signals, audio_signal: AudioSignal):
+    # frequencies in kHz of the transmit set, empty when not transmitting (was a single int before)
+    update_current_frequency = Signal(list)
+    transmitters_changed = Signal(list)
+    audio_ready = Signal()
+    # transmitter, frequency; carries a ptt selection from the listener thread to the GUI thread
+    _transmitter_selected = Signal(int, int)
+
+    def __init__(self, signals: Signals, audio_signal: AudioSignal, enable_audio: bool = True):
         super().__init__()
 
         self._network = NetworkHandler(signals)
-        self._audio = AudioHandler(audio_signal)
+        # without audio the client only receives, nothing touches the sound devices
+        self._audio: Optional["AudioHandler"] = None
+        if enable_audio:
+            from .audio_devices import AudioDeviceRegistry
+            from .audio_handler import AudioHandler
+            devices = AudioDeviceRegistry()
+            devices.initialize()
+            devices.start()
+            self._audio = AudioHandler(audio_signal, devices)
+        self._ptt = PTTController(self.set_ptt_state, self.select_transmitter, audio_signal)
         self._signals = signals
+        self._recorder: Optional[AudioRecorder] = None
+        self._transmission_index: Optional[TransmissionIndex] = None
+        self._replay_buffer = ReplayBuffer(config.replay_buffer_time * 60)
+        self._talk_state = TalkStateTracker()
+        self._talk_state.start()
 
         self._connection_state = ConnectionState.DISCONNECTED
         self._cid: Optional[int] = None
         self._callsign: Optional[str] = None
         self._jwt_token: Optional[str] = None
-        self._current_frequency: int = 0
-        self._current_transmitter: int = 0
+        self._transmit_set: dict[int, int] = {}
+        self._transmit_targets: tuple[tuple[int, int], ...] = ()
         self._main_frequency: int = 0
         self._is_atc: bool = False
         self._transmitter_receive_flag: dict[int, bool] = {}
+        self._transmitter_frequency: dict[int, int] = {}
+        self._last_ping_time: Optional[float] = None
+        # (cid, frequency) -> arrival time of the last packet
+        self._last_packet_arrival: dict[tuple[int, int], float] = {}
 
         self._connect_signals()
 
@@ -46,14 +90,23 @@ class VoiceClient(QObject):
 
     def _connect_signals(self):
         self._network.control_message_received.connect(self._handle_control_message)
-        self._network.voice_packet_received.connect(self._handle_voice_packet)
+        # handled on the network thread, nothing in the receive path touches the GUI
+        self._network.voice_packet_received.connect(self._handle_voice_packet, Qt.ConnectionType.DirectConnection)
         self._network.connection_status_changed.connect(self._handle_connection_status)
         self._network.error_occurred.connect(self.error_occurred)
+        self._transmitter_selected.connect(self._apply_transmitter_selection, Qt.ConnectionType.QueuedConnection)
+        # dict.pop is safe from the expiry thread, the receive path only reads and sets single keys
+        self._talk_state.talk_stopped.connect(self._talk_stopped, Qt.ConnectionType.DirectConnection)
 
-        self._audio.on_encoded_audio = self._send_voice_data
+        if self._audio is not None:
+            self._audio.on_encoded_audio = self._send_voice_data
 
     def connect_to_server(self, host: str, tcp_port: int, udp_port: int):
         self._set_connection_state(ConnectionState.CONNECTING)
+        if config.packet_capture:
+            check_directory(config.capture_path, create_if_not_exist=True)
+            self._network.start_capture(
+                join(config.capture_path, f"{datetime.now().strftime('%Y%m%d-%H%M%S')}.cap"))
         self._network.connect_to_server(host, tcp_port, udp_port, self._jwt_token)
 
     def disconnect(self):
@@ -62,19 +115,43 @@ class VoiceClient(QObject):
     def clear_frequency(self):
         if not self._is_ready():
             return
-        self._current_frequency = 0
-        self._current_transmitter = 0
-        self.update_current_frequency.emit(0)
+        removed = list(self._transmit_set)
+        self._transmit_set.clear()
+        self._update_transmit_targets()
+        for transmitter in removed:
+            self._send_switch(transmitter, 0)
 
     def switch_frequency(self, frequency: int, transmitter: int = 0):
+        if not self._is_ready():
+            return
+        removed = [key for key in self._transmit_set if key != transmitter]
+        for key in removed:
+            del self._transmit_set[key]
+        for key in removed:
+            self._send_switch(key, 0)
+        self.add_transmit_frequency(frequency, transmitter)
+
+    def add_transmit_frequency(self, frequency: int, transmitter: int):
         if not self._is_ready():
             return
 
-        self._current_frequency = frequency
-        self._current_transmitter = transmitter
+        self._transmit_set[transmitter] = frequency
+        self._update_transmit_targets()
 
-        self.update_current_frequency.emit(frequency)
+        self._log_message("INFO", f"Switch to {frequency / 1000:.3f}mHz")
+        self._send_switch(transmitter, frequency)
 
+    def remove_transmit_frequency(self, transmitter: int):
+        if not self._is_ready() or transmitter not in self._transmit_set:
+            return
+        del self._transmit_set[transmitter]
+        self._update_transmit_targets()
+        self._send_switch(transmitter, 0)
+
+    def _send_switch(self, transmitter: int, frequency: int):
+        # protocol: SWITCH carries the transmitter's new frequency in kHz as data. "0" means the transmitter
+        # left the transmit set and the server is expected to stop routing it. Clients that never remove a
+        # transmitter keep sending only real frequencies, so servers unaware of "0" see no other change
         message = ControlMessage(
             type=MessageType.SWITCH,
             cid=self._cid,
@@ -82,9 +159,44 @@ class VoiceClient(QObject):
             transmitter=transmitter,
             data=str(frequency)
         )
-        self._log_message("INFO", f"Switch to {frequency / 1000:.3f}mHz")
         self._network.send_control_message(message)
 
+    def _update_transmit_targets(self):
+        # the audio thread only ever reads this tuple, so it is replaced instead of mutated
+        self._transmit_targets = tuple(sorted(self._transmit_set.items()))
+        self.update_current_frequency.emit([frequency for _, frequency in self._transmit_targets])
+        self.transmitters_changed.emit([transmitter for transmitter, _ in self._transmit_targets])
+
+    def set_transmitter_frequency(self, transmitter: int, frequency: int):
+        if frequency <= 0:
+            self._transmitter_frequency.pop(transmitter, None)
+        else:
+            self._transmitter_frequency[transmitter] = frequency
+
+    def select_transmitter(self, target: PTTTarget) -> bool:
+        # runs on the input listener thread right before ptt goes active. The targets the audio thread sends to
+        # are swapped here so the pre-roll already goes out on the selected transmitter, the transmit set,
+        # the server and the ui follow on the GUI thread
+        if target.type == ptt_binding_transmitter:
+            transmitter = target.value
+            frequency = self._transmitter_frequency.get(transmitter, 0)
+        else:
+            frequency = target.value
+            transmitter = next((key for key, value in self._transmitter_frequency.items() if value == frequency), 0)
+        if frequency == 0 or not self._is_ready():
+            return False
+        # a binding switches to its transmitter for pilots and controllers alike, adding it to a cross-coupled
+        # set would leave it there after the key is released
+        targets = ((transmitter, frequency),)
+        if self._transmit_targets == targets:
+            return True
+        self._transmit_targets = targets
+        self._transmitter_selected.emit(transmitter, frequency)
+        return True
+
+    def _apply_transmitter_selection(self, transmitter: int, frequency: int):
+        self.switch_frequency(frequency, transmitter)
+
     def send_text_message(self, target: str, message: str):
         if not self._is_ready():
             return
@@ -97,8 +209,20 @@ class VoiceClient(QObject):
         )
         self._network.send_control_message(control_message)
 
+    def attach_audio(self, audio: "AudioHandler"):
+        # audio is created by the warm-up thread after the client itself
+        if self._audio is not None:
+            return
+        audio.on_encoded_audio = self._send_voice_data
+        self._audio = audio
+        if self._is_ready():
+            audio.start_recording()
+            audio.start_playback()
+        self.audio_ready.emit()
+
     def set_ptt_state(self, active: bool):
-        self._audio.set_ptt_state(active)
+        if self._audio is not None:
+            self._audio.set_ptt_state(active)
 
     def _set_connection_state(self, state: ConnectionState):
         if self._connection_state != state:
@@ -119,19 +243,33 @@ class VoiceClient(QObject):
             callsign=self._callsign,
             data=str(int(time.time()))
         )
+        self._last_ping_time = time.monotonic()
         self._network.send_control_message(message)
 
     def _send_voice_data(self, encoded_data: bytes):
-        if not self._is_ready() or self._current_frequency == 0:
+        targets = self._transmit_targets
+        if not self._is_ready() or not targets:
             return
 
         self.voice_data_sent.emit()
-        packet = VoicePacketBuilder.build_packet(self._cid,
-                                                 self._current_transmitter,
-                                                 self._current_frequency,
-                                                 self._callsign,
-                                                 encoded_data)
-        self._network.send_voice_packet(packet)
+        _sent_frames.inc()
+        timestamp = time.time()
+        recorder = self._recorder
+        transmission_index = self._transmission_index
+        # the frame is encoded once and only wrapped per frequency
+        for transmitter, frequency in targets:
+            packet = VoicePacketBuilder.build_packet(self._cid,
+                                                     transmitter,
+                                                     frequency,
+                                                     self._callsign,
+                                                     encoded_data)
+            self._network.send_voice_packet(packet)
+            if encoded_data:
+                self._talk_state.packet(True, self._cid, self._callsign, frequency)
+            if recorder is not None:
+                recorder.write(frequency, self._cid, encoded_data, timestamp)
+            if transmission_index is not None:
+                transmission_index.add_packet(True, self._cid, self._callsign, frequency, transmitter, timestamp)
 
     def _handle_control_message(self, message: ControlMessage):
         self.message_received.emit(message)
@@ -141,14 +279,19 @@ class VoiceClient(QObject):
             self.error_occurred.emit(message.data)
         elif message.type == MessageType.PONG:
             logger.debug("Received pong from server")
+            if self._last_ping_time is not None:
+                _round_trip_time.observe(time.monotonic() - self._last_ping_time)
+                self._last_ping_time = None
         elif message.type == MessageType.MESSAGE:
             if message.data.startswith("SERVER:"):
                 if "Welcome" in message.data:
                     data = message.data.split(":")
                     self._callsign = data[1]
                     self._heartbeat_timer.start()
-                    self._audio.start_recording()
-                    self._audio.start_playback()
+                    if self._audio is not None:
+                        self._audio.start_recording()
+                        self._audio.start_playback()
+                    self._start_archive()
                     if len(data) == 4:
                         self._main_frequency = int(data[-1])
                         self._is_atc = True
@@ -157,22 +300,81 @@ class VoiceClient(QObject):
                     self._send_voice_data(b"")
         elif message.type == MessageType.DISCONNECT:
             self._heartbeat_timer.stop()
-            self._audio.stop_recording()
-            self._audio.stop_playback()
+            if self._audio is not None:
+                self._audio.stop_recording()
+                self._audio.stop_playback()
+            self._stop_archive()
+            self._last_packet_arrival.clear()
             self._network.disconnect()
             self._set_connection_state(ConnectionState.DISCONNECTED)
 
     def _handle_voice_packet(self, packet: VoicePacket):
         if not self._transmitter_receive_flag.get(packet.frequency, False):
             return
+        _received_packets.inc()
+        arrival = time.monotonic()
+        key = (packet.cid, packet.frequency)
+        last_arrival = self._last_packet_arrival.get(key)
+        if last_arrival is not None and arrival - last_arrival < transmission_gap_time:
+            _packet_interval.observe(arrival - last_arrival)
+        self._last_packet_arrival[key] = arrival
         self.voice_data_received.emit(packet)
-        self._audio.play_encoded_audio(packet.data)
+        audio = self._audio
+        if audio is not None:
+            audio.play_encoded_audio(packet.data, packet.frequency)
+        self._talk_state.packet(False, packet.cid, packet.callsign, packet.frequency)
+        timestamp = time.time()
+        self._replay_buffer.add_packet(packet, timestamp)
+        recorder = self._recorder
+        if recorder is not None:
+            recorder.write(packet.frequency, packet.cid, packet.data, timestamp)
+        transmission_index = self._transmission_index
+        if transmission_index is not None:
+            transmission_index.add_packet(False, packet.cid, packet.callsign, packet.frequency,
+                                          packet.transmitter, timestamp)
+
+    def replay_last_transmission(self, frequency: Optional[int] = None) -> Optional[Transmission]:
+        transmission = self._replay_buffer.last_transmission(frequency)
+        if transmission is None or self._audio is None:
+            return None
+        self._log_message("INFO", f"Replay {transmission.callsign} on {transmission.frequency / 1000:.3f}mHz")
+        self._audio.play_replay(transmission.packets)
+        return transmission
+
+    def _start_archive(self):
+        if config.record_enabled and self._recorder is None:
+            recorder = AudioRecorder(config.record_path, config.record_split_time * 60)
+            recorder.start()
+            self._recorder = recorder
+            self._log_message("INFO", f"Recording to {config.record_path}")
+        if config.transmission_index and self._transmission_index is None:
+            transmission_index = TransmissionIndex(join(config.record_path, transmission_index_file), self._recorder)
+            transmission_index.start()
+            self._transmission_index = transmission_index
+
+    def _stop_archive(self):
+        recorder = self._recorder
+        transmission_index = self._transmission_index
+        self._recorder = None
+        self._transmission_index = None
+        if transmission_index is not None:
+            transmission_index.stop()
+        if recorder is not None:
+            recorder.stop()
+
+    def _talk_stopped(self, stream: TalkStream):
+        if not stream.sent:
+            self._last_packet_arrival.pop((stream.cid, stream.frequency), None)
 
     def _handle_connection_status(self, connected: bool):
         if connected:
             self._set_connection_state(ConnectionState.CONNECTED)
         else:
             self._heartbeat_timer.stop()
+            self._stop_archive()
+            # the server may drop the link without a DISCONNECT; flush the capture either way
+            self._network.stop_capture()
+            self._last_packet_arrival.clear()
             self._set_connection_state(ConnectionState.DISCONNECTED)
 
     def set_transmitter_receive_flag(self, frequency: int, receive_flag: bool):
@@ -184,7 +386,33 @@ class VoiceClient(QObject):
 
     def cleanup(self):
         self.disconnect()
-        self._audio.cleanup()
+        if self._audio is not None:
+            self._audio.cleanup()
+        self._talk_state.stop()
+
+    @property
+    def has_audio(self) -> bool:
+        return self._audio is not None
+
+    @property
+    def ptt_controller(self) -> PTTController:
+        return self._ptt
+
+    @property
+    def talk_state(self) -> TalkStateTracker:
+        return self._talk_state
+
+    @property
+    def input_meter(self) -> Optional["LevelMeter"]:
+        if self._audio is None:
+            return None
+        return self._audio.input_meter
+
+    @property
+    def playback_meters(self) -> dict[int, "LevelMeter"]:
+        if self._audio is None:
+            return {}
+        return self._audio.playback_meters
 
     @property
     def connection_state(self) -> ConnectionState:
@@ -1,10 +1,11 @@
 from dataclasses import dataclass
 from enum import Enum
-from struct import pack
-from typing import List
+from struct import pack, unpack
+from typing import List, Optional
 
 
 class MessageType(str, Enum):
+    # data is the frequency in kHz of the given transmitter, "0" removes the transmitter
     SWITCH = "channel"
     PING = "ping"
     PONG = "pong"
@@ -39,6 +40,16 @@ class ControlMessage:
             "data": self.data
         }
 
+    @staticmethod
+    def from_dict(message_dict: dict) -> "ControlMessage":
+        return ControlMessage(
+            type=MessageType(message_dict.get('type')),
+            cid=message_dict.get('cid', 0),
+            callsign=message_dict.get('callsign', ''),
+            transmitter=message_dict.get('transmitter', 0),
+            data=message_dict.get('data', '')
+        )
+
 
 @dataclass
 class ChannelInfo:
@@ -86,3 +97,17 @@ class VoicePacketBuilder:
         packet.extend(b'\n')
 
         return bytes(packet)
+
+    @staticmethod
+    def parse_packet(data: bytes) -> Optional[VoicePacket]:
+        # None when the datagram is too short or its length fields don't add up
+        if len(data) < 10 or data[-1] != 0x0A:
+            return None
+        cid = unpack('<i', data[0:4])[0]
+        transmitter = unpack('<b', data[4:5])[0]
+        frequency = unpack('<i', data[5:9])[0] + 100000
+        callsign_len = data[9]
+        if 9 + callsign_len > len(data) - 1:
+            return None
+        callsign = data[10:10 + callsign_len].decode("utf-8")
+        return VoicePacket(cid, transmitter, frequency, callsign, data[10 + callsign_len:-1])
@@ -0,0 +1,169 @@
+# Kept outside src.utils so that importing it loads nothing but the standard library,
+# the import hook has to be installed before the first heavy import.
+import sys
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from importlib.abc import MetaPathFinder
+from json import dump
+from threading import Lock, current_thread, local
+from time import perf_counter
+from typing import Any, Iterator, Optional
+
+
+@dataclass
+class Span:
+    name: str
+    thread: str
+    start: float
+    duration: float = 0
+    children: list["Span"] = field(default_factory=list)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "thread": self.thread,
+            "start": round(self.start, 6),
+            "duration": round(self.duration, 6),
+            "children": [child.to_dict() for child in self.children]
+        }
+
+
+@dataclass
+class ImportRecord:
+    module: str
+    start: float
+    duration: float = 0
+    # duration minus the imports it triggered
+    self_duration: float = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "module": self.module,
+            "start": round(self.start, 6),
+            "duration": round(self.duration, 6),
+            "self": round(self.self_duration, 6)
+        }
+
+
+class _TimedLoader:
+    def __init__(self, loader: Any, profiler: "StartupProfiler"):
+        self._loader = loader
+        self._profiler = profiler
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._loader, name)
+
+    def create_module(self, spec) -> Any:
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module) -> None:
+        with self._profiler.time_import(module.__name__):
+            self._loader.exec_module(module)
+
+
+class _ImportTimer(MetaPathFinder):
+    def __init__(self, profiler: "StartupProfiler"):
+        self._profiler = profiler
+        self._local = local()
+
+    def find_spec(self, fullname: str, path, target=None):
+        if getattr(self._local, "searching", False):
+            return None
+        self._local.searching = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._local.searching = False
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _TimedLoader(spec.loader, self._profiler)
+        return spec
+
+
+class StartupProfiler:
+    def __init__(self):
+        self._origin = perf_counter()
+        self._lock = Lock()
+        self._local = local()
+        self._spans: list[Span] = []
+        self._marks: dict[str, float] = {}
+        self._imports: list[ImportRecord] = []
+        self._import_timer: Optional[_ImportTimer] = None
+
+    def _now(self) -> float:
+        return perf_counter() - self._origin
+
+    def enable_import_timing(self) -> None:
+        if self._import_timer is not None:
+            return
+        self._import_timer = _ImportTimer(self)
+        sys.meta_path.insert(0, self._import_timer)
+
+    def disable_import_timing(self) -> None:
+        if self._import_timer is None:
+            return
+        sys.meta_path.remove(self._import_timer)
+        self._import_timer = None
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[Span]:
+        stack: list[Span] = self._local.__dict__.setdefault("spans", [])
+        span = Span(name, current_thread().name, self._now())
+        if stack:
+            stack[-1].children.append(span)
+        else:
+            with self._lock:
+                self._spans.append(span)
+        stack.append(span)
+        try:
+            yield span
+        finally:
+            span.duration = self._now() - span.start
+            stack.pop()
+
+    @contextmanager
+    def time_import(self, module: str) -> Iterator[None]:
+        stack: list[ImportRecord] = self._local.__dict__.setdefault("imports", [])
+        record = ImportRecord(module, self._now())
+        stack.append(record)
+        try:
+            yield
+        finally:
+            record.duration = self._now() - record.start
+            record.self_duration += record.duration
+            stack.pop()
+            if stack:
+                stack[-1].self_duration -= record.duration
+            with self._lock:
+                self._imports.append(record)
+
+    def mark(self, name: str) -> None:
+        self._marks[name] = self._now()
+
+    @property
+    def elapsed(self) -> float:
+        return self._now()
+
+    def report(self) -> dict[str, Any]:
+        with self._lock:
+            spans = list(self._spans)
+            imports = sorted(self._imports, key=lambda record: record.self_duration, reverse=True)
+        return {
+            "total": round(self._now(), 6),
+            "marks": {name: round(offset, 6) for name, offset in self._marks.items()},
+            "spans": [span.to_dict() for span in spans],
+            "imports": [record.to_dict() for record in imports]
+        }
+
+    def write_report(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as file:
+            dump(self.report(), file, indent=2, ensure_ascii=False)
+
+
+startup_profiler = StartupProfiler()
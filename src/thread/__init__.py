@@ -1,2 +1,3 @@
 from .mouse_listener import MouseListenerThread
 from .keyboard_listener import KeyboardListenerThread
+from .key_utils import parse_key
@@ -0,0 +1,18 @@
+from ast import literal_eval
+from typing import Optional, Union
+
+from pynput.keyboard import Key, KeyCode
+from pynput.mouse import Button
+
+
+def parse_key(name: str) -> Optional[Union[Key, KeyCode, Button]]:
+    try:
+        if name.startswith("Key."):
+            return Key[name[4:]]
+        if name.startswith("Button."):
+            return Button[name[7:]]
+        if name.startswith("<") and name.endswith(">"):
+            return KeyCode.from_vk(int(name[1:-1]))
+        return KeyCode.from_char(literal_eval(name))
+    except (KeyError, ValueError, SyntaxError, TypeError):
+        return None
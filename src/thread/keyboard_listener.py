@@ -3,13 +3,15 @@ from typing import Optional, Union
 from PySide6.QtCore import QThread
 from pynput.keyboard import Key, KeyCode, Listener
 
+from src.core.ptt_controller import PTTController
 from src.signal import KeyBoardSignals
 
 
 class KeyboardListenerThread(QThread):
-    def __init__(self, signals: KeyBoardSignals):
+    def __init__(self, signals: KeyBoardSignals, ptt_controller: Optional[PTTController] = None):
         super().__init__()
         self.signals = signals
+        self.ptt_controller = ptt_controller
         self.listener: Optional[Listener] = None
 
     def run(self, /):
@@ -19,9 +21,13 @@ class KeyboardListenerThread(QThread):
     def on_press(self, button: Optional[Union[Key, KeyCode]]) -> None:
         if button is None:
             return
+        if self.ptt_controller is not None:
+            self.ptt_controller.key_pressed(button)
         self.signals.key_pressed.emit(str(button))
 
     def on_release(self, button: Optional[Union[Key, KeyCode]]) -> None:
         if button is None:
             return
+        if self.ptt_controller is not None:
+            self.ptt_controller.key_released(button)
         self.signals.key_released.emit(str(button))
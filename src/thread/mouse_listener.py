@@ -3,13 +3,15 @@ from typing import Optional
 from PySide6.QtCore import QThread
 from pynput.mouse import Button, Listener
 
+from src.core.ptt_controller import PTTController
 from src.signal import MouseSignals
 
 
 class MouseListenerThread(QThread):
-    def __init__(self, signals: MouseSignals):
+    def __init__(self, signals: MouseSignals, ptt_controller: Optional[PTTController] = None):
         super().__init__()
         self.signals = signals
+        self.ptt_controller = ptt_controller
         self.listener: Optional[Listener] = None
 
     def run(self, /):
@@ -20,6 +22,10 @@ class MouseListenerThread(QThread):
         if button is None:
             return
         if pressed:
+            if self.ptt_controller is not None:
+                self.ptt_controller.key_pressed(button)
             self.signals.mouse_clicked.emit(str(button))
         else:
+            if self.ptt_controller is not None:
+                self.ptt_controller.key_released(button)
             self.signals.mouse_released.emit(str(button))
@@ -1,13 +1,13 @@
-from threading import Event, Thread
-from time import sleep
-
+from PySide6.QtCore import QTimer
 from PySide6.QtWidgets import QWidget
-from loguru import logger
 
+from .component import LevelBar
 from .form import Ui_ClientWindow
+from ..config import config
+from ..constants import level_meter_interval
 from ..core import VoiceClient
+from ..core.frequency_watcher import FrequencyWatcher
 from ..core.fsuipc_client import FSUIPCClient
-from ..model import ConnectionState
 
 
 class ClientWindow(QWidget, Ui_ClientWindow):
@@ -19,8 +19,10 @@ class ClientWindow(QWidget, Ui_ClientWindow):
         self.button_com2_tx.clicked.connect(self.com2_freq_tx_clicked)
 
         self.voice_client = voice_client
+        self.voice_client.transmitters_changed.connect(self.transmitters_changed)
         self.fsuipc_client = fsuipc_client
-        self.thread_exit = Event()
+        self.frequency_watcher = FrequencyWatcher(fsuipc_client, config.fsuipc_poll_interval)
+        self.frequency_watcher.com_changed.connect(self.update_com_info)
         self.com1_freq = 0
         self.com2_freq = 0
         self.com1_rx = False
@@ -28,6 +30,14 @@ class ClientWindow(QWidget, Ui_ClientWindow):
         self.overwrite_com1_freq = 0
         self.overwrite_com2_freq = 0
 
+        self.level_com1 = LevelBar(self.group_com)
+        self.level_com2 = LevelBar(self.group_com)
+        self.layout_coms.addWidget(self.level_com1, 0, 4, 1, 1)
+        self.layout_coms.addWidget(self.level_com2, 1, 4, 1, 1)
+        self._level_timer = QTimer()
+        self._level_timer.setInterval(level_meter_interval)
+        self._level_timer.timeout.connect(self.update_levels)
+
     def com1_freq_tx_clicked(self):
         self.button_com2_tx.selected = False
         if self.button_com1_tx.selected:
@@ -42,34 +52,33 @@ class ClientWindow(QWidget, Ui_ClientWindow):
         else:
             self.voice_client.clear_frequency()
 
+    def transmitters_changed(self, transmitters: list[int]):
+        self.button_com1_tx.selected = 0 in transmitters
+        self.button_com2_tx.selected = 1 in transmitters
+
     def start(self):
-        self.thread_exit.clear()
-        Thread(target=self._receive_frequency, daemon=True).start()
+        self.frequency_watcher.poll_interval = config.fsuipc_poll_interval
+        self.frequency_watcher.start()
+        self._level_timer.start()
 
     def stop(self):
-        self.thread_exit.set()
-
-    def _receive_frequency(self):
-        err_count = 0
-        while not self.thread_exit.is_set():
-            res = self.fsuipc_client.get_frequency()
-            if res.requestStatus:
-                self.update_com_info(res.frequency[0] // 1000,
-                                     res.frequency[2] // 1000,
-                                     (res.frequencyFlag & 0x80) != 0x80,
-                                     (res.frequencyFlag & 0x40) != 0x40)
-            else:
-                logger.error(f"Error while receiving frequency from FSUIPC: {res.errMessage}")
-                err_count += 1
-            if err_count >= 3:
-                logger.error(f"Too many error received from FSUIPC: {err_count}, disconnecting")
-            sleep(1)
+        self.frequency_watcher.stop()
+        self._level_timer.stop()
+        self.level_com1.set_level(0, 0)
+        self.level_com2.set_level(0, 0)
+
+    def update_levels(self):
+        meters = self.voice_client.playback_meters
+        for frequency, level_bar in ((self.com1_freq, self.level_com1), (self.com2_freq, self.level_com2)):
+            meter = meters.get(frequency)
+            level_bar.set_level(*(meter.level if meter is not None else (0, 0)))
 
     def update_com_info(self, com1_freq: int, com2_freq: int, com1_rx: bool, com2_rx: bool):
         if self.com1_freq != com1_freq:
             if self.com1_freq != 0:
                 self.voice_client.set_transmitter_receive_flag(self.com1_freq, False)
             self.voice_client.set_transmitter_receive_flag(com1_freq, self.com1_rx | com1_rx)
+            self.voice_client.set_transmitter_frequency(0, com1_freq)
             self.label_com1_freq.setText(f"{com1_freq / 1000:.3f}")
             if self.button_com1_tx.selected:
                 self.voice_client.switch_frequency(com1_freq, 0)
@@ -79,6 +88,7 @@ class ClientWindow(QWidget, Ui_ClientWindow):
             if self.com2_freq != 0:
                 self.voice_client.set_transmitter_receive_flag(self.com2_freq, False)
             self.voice_client.set_transmitter_receive_flag(com2_freq, self.com2_rx | com2_rx)
+            self.voice_client.set_transmitter_frequency(1, com2_freq)
             self.label_com2_freq.setText(f"{com2_freq / 1000:.3f}")
             if self.button_com2_tx.selected:
                 self.voice_client.switch_frequency(com2_freq, 1)
@@ -1,3 +1,3 @@
 from .hotkey_button import HotkeyButton
-from .ptt_button import PTTButton
+from .level_bar import LevelBar
 from .loading_spinner import LoadingSpinner
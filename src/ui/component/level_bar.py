@@ -0,0 +1,44 @@
+from math import log10
+
+from PySide6.QtCore import QLineF, QRectF, Qt
+from PySide6.QtGui import QColor, QPainter
+from PySide6.QtWidgets import QSizePolicy, QWidget
+
+from src.constants import level_bar_floor
+
+
+class LevelBar(QWidget):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Fixed)
+        self.setMinimumSize(60, 8)
+        self.setMaximumHeight(8)
+        self._rms = 0.0
+        self._peak = 0.0
+
+    @staticmethod
+    def _position(level: float) -> float:
+        if level <= 0:
+            return 0.0
+        return max(0.0, 1.0 - 20 * log10(level) / level_bar_floor)
+
+    def set_level(self, rms: float, peak: float):
+        rms = self._position(rms)
+        peak = self._position(peak)
+        if abs(rms - self._rms) < 0.005 and abs(peak - self._peak) < 0.005:
+            return
+        self._rms = rms
+        self._peak = peak
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        rect = QRectF(self.rect())
+        painter.fillRect(rect, QColor(60, 60, 60))
+        if self._rms > 0:
+            color = QColor(220, 80, 70) if self._peak >= 0.99 else QColor(89, 189, 130)
+            painter.fillRect(QRectF(rect.left(), rect.top(), rect.width() * self._rms, rect.height()), color)
+        if self._peak > 0:
+            painter.setPen(Qt.GlobalColor.white)
+            x = rect.left() + (rect.width() - 1) * self._peak
+            painter.drawLine(QLineF(x, rect.top(), x, rect.bottom()))
@@ -1,40 +1,69 @@
+from typing import Optional, TYPE_CHECKING
+
 from PySide6.QtWidgets import QWidget
 from loguru import logger
 
 from .form import Ui_ConfigWindow
 from src.config import config
 from src.signal import AudioSignal
-from src.utils import get_device_info, get_host_api_info
+
+if TYPE_CHECKING:
+    from src.core.audio_devices import AudioDeviceRegistry
 
 
 class ConfigWindow(QWidget, Ui_ConfigWindow):
-    def __init__(self, audio_signal: AudioSignal):
+    def __init__(self, audio_signal: AudioSignal, devices: Optional["AudioDeviceRegistry"] = None):
         super().__init__()
         self.setupUi(self)
         config.add_config_save_callback(self.update_config_data)
 
         self.audio_signal = audio_signal
 
-        self._audio_drivers = get_host_api_info()
+        # audio may still be warming up or have failed, the device lists stay disabled until attach_devices
+        self._devices: Optional["AudioDeviceRegistry"] = None
+        self._audio_drivers = {}
         self._audio_inputs = {}
         self._audio_outputs = {}
         self.combo_box_audio_driver.addItem("自动")
+        self.combo_box_audio_input.addItem("默认")
+        self.combo_box_audio_output.addItem("默认")
+        self._set_audio_enabled(False)
+        self.update_config_data()
+
+        self.button_cancel.clicked.connect(self.cancel_config_data)
+        self.button_apply.clicked.connect(self.apply_config_data)
+        self.button_ok.clicked.connect(self.save_config_data)
+
+        self.button_ptt.select_message = "按下ESC退出"
+
+        if devices is not None:
+            self.attach_devices(devices)
+
+    def attach_devices(self, devices: "AudioDeviceRegistry"):
+        if self._devices is not None:
+            return
+        self._devices = devices
+        self._audio_drivers = devices.host_apis
         for driver in self._audio_drivers:
             self.combo_box_audio_driver.addItem(driver)
 
-        self.combo_box_audio_driver.currentTextChanged.connect(self.audio_device_update)
+        # select the saved driver before listening, so the devices are only enumerated once
+        self.combo_box_audio_driver.setCurrentText(config.audio_driver)
         self.audio_device_update(self.combo_box_audio_driver.currentText())
-        self.update_config_data()
+        self.combo_box_audio_driver.currentTextChanged.connect(self.audio_device_update)
+        self.combo_box_audio_input.setCurrentText(config.audio_input)
+        self.combo_box_audio_output.setCurrentText(config.audio_output)
         self.combo_box_audio_input.currentTextChanged.connect(self.audio_input_device_change)
         self.audio_input_device_change(self.combo_box_audio_input.currentText())
         self.combo_box_audio_output.currentTextChanged.connect(self.audio_output_device_change)
         self.audio_output_device_change(self.combo_box_audio_output.currentText())
+        devices.devices_changed.connect(self.audio_devices_changed)
+        self._set_audio_enabled(True)
 
-        self.button_cancel.clicked.connect(self.cancel_config_data)
-        self.button_apply.clicked.connect(self.apply_config_data)
-        self.button_ok.clicked.connect(self.save_config_data)
-
-        self.button_ptt.select_message = "按下ESC退出"
+    def _set_audio_enabled(self, enabled: bool):
+        self.combo_box_audio_driver.setEnabled(enabled)
+        self.combo_box_audio_input.setEnabled(enabled)
+        self.combo_box_audio_output.setEnabled(enabled)
 
     def audio_input_device_change(self, value: str):
         if not value:
@@ -57,7 +86,7 @@ class ConfigWindow(QWidget, Ui_ConfigWindow):
                     driver_id = self._audio_drivers[name]
             if driver_id == -1:
                 driver_id = 0
-        self._audio_inputs, self._audio_outputs = get_device_info(driver_id)
+        self._audio_inputs, self._audio_outputs = self._devices.devices(driver_id)
 
         self.combo_box_audio_input.clear()
         self.combo_box_audio_input.addItem("默认")
@@ -71,6 +100,13 @@ class ConfigWindow(QWidget, Ui_ConfigWindow):
             self.combo_box_audio_output.addItem(output_device)
         self.combo_box_audio_output.setCurrentIndex(0)
 
+    def audio_devices_changed(self):
+        # device indexes change after a rescan, so the lists are rebuilt and the saved devices selected again
+        self._audio_drivers = self._devices.host_apis
+        self.audio_device_update(self.combo_box_audio_driver.currentText())
+        self.combo_box_audio_input.setCurrentText(config.audio_input)
+        self.combo_box_audio_output.setCurrentText(config.audio_output)
+
     def update_config_data(self):
         self.label_config_version_2.setText(config.config_version)
         self.check_box_remember_me.setChecked(config.remember_me)
@@ -99,9 +135,11 @@ class ConfigWindow(QWidget, Ui_ConfigWindow):
         config.server_host = self.line_edit_server_address.text()
         config.server_tcp_port = int(self.line_edit_tcp_port.text())
         config.server_udp_port = int(self.line_edit_udp_port.text())
-        config.audio_driver = self.combo_box_audio_driver.currentText()
-        config.audio_input = self.combo_box_audio_input.currentText()
-        config.audio_output = self.combo_box_audio_output.currentText()
+        if self._devices is not None:
+            # without devices the lists only hold placeholders, the saved choice is kept
+            config.audio_driver = self.combo_box_audio_driver.currentText()
+            config.audio_input = self.combo_box_audio_input.currentText()
+            config.audio_output = self.combo_box_audio_output.currentText()
         config.ptt_key = self.button_ptt.selected_key
         config.save_config()
 
@@ -1,48 +1,44 @@
+from collections import deque
 from datetime import datetime
 from os import getcwd
 from os.path import join
-from threading import Thread
-from time import sleep, time
 
-from PySide6.QtCore import QTimer, Signal
-from PySide6.QtWidgets import QMessageBox, QWidget
+from PySide6.QtCore import QTimer
+from PySide6.QtWidgets import QMessageBox, QTableWidgetItem, QWidget
 from loguru import logger
 
 from src.config import config
 from src.core import VoiceClient
-from src.model import ConnectionState, VoicePacket
+from src.model import ConnectionState
 from src.signal import Signals
 from src.utils import get_line_edit_data
 from .client_window import ClientWindow
 from .controller_window import ControllerWindow
 from .form import Ui_ConnectWindow
-from ..constants import default_frame_time
+from .component import LevelBar
+from ..constants import (active_speaker_refresh_interval, fsuipc_backend_fake, level_meter_interval,
+                         log_flush_interval, log_view_max_lines)
+from ..core.fake_fsuipc import FakeFSUIPCLibrary
 from ..core.fsuipc_client import FSUIPCClient
+from ..core.simulator_connector import SimulatorConnector
+from ..core.talk_state import TalkStream
 
 
 class ConnectWindow(QWidget, Ui_ConnectWindow):
-    fsuipc_client_connected = Signal()
-    fsuipc_client_connect_fail = Signal()
-
     def __init__(self, voice_client: VoiceClient, signals: Signals):
         super().__init__()
         self.setupUi(self)
 
-        try:
-            self.fsuipc_client = FSUIPCClient(join(getcwd(), "libfsuipc.dll"))
-        except FileNotFoundError:
-            logger.error("Cannot find libfsuipc.dll")
-            QMessageBox.critical(self, "Cannot load libfsuipc.dll",
-                                 f"Cannot found libfsuipc.dll, download it and put it under {getcwd()}")
-            exit(1)
-        except Exception as e:
-            logger.error(f"Fail to load libfsuipc.dll, {e}")
-            QMessageBox.critical(self, "Cannot load libfsuipc.dll",
-                                 "Unknown error occurred while loading libfsuipc.dll")
-            exit(1)
+        if config.fsuipc_backend == fsuipc_backend_fake:
+            self.fsuipc_client = self._create_fake_fsuipc_client()
+        else:
+            self.fsuipc_client = self._create_fsuipc_client()
 
         self.voice_client = voice_client
         self.button_connect.clicked.connect(self.connect_to_server)
+        # connecting waits until the audio warm-up attached the sound devices
+        self.button_connect.setEnabled(voice_client.has_audio)
+        self.voice_client.audio_ready.connect(lambda: self.button_connect.setEnabled(True))
         self.voice_client.error_occurred.connect(self.handle_connect_error)
         self.voice_client.connection_state_changed.connect(self.connect_state_changed)
         self.controller_window = ControllerWindow(voice_client)
@@ -52,49 +48,118 @@ class ConnectWindow(QWidget, Ui_ConnectWindow):
         self.windows.addWidget(self.client_window)
         self.windows.setCurrentIndex(0)
         self.button_exit.clicked.connect(lambda: signals.logout_request.emit())
-        self.fsuipc_client_connected.connect(self.fsuipc_connect)
-        self.fsuipc_client_connect_fail.connect(self.fsuipc_connection_fail)
+        self.simulator_connector = SimulatorConnector(self.fsuipc_client)
+        self.simulator_connector.connected.connect(self.fsuipc_connect)
+        self.simulator_connector.connect_failed.connect(self.fsuipc_connection_fail)
+        self.simulator_connector.status_message.connect(
+            lambda level, message: self.log_message("FSUIPC", level, message))
+        self.client_window.frequency_watcher.connection_lost.connect(self.fsuipc_connection_lost)
+        self._simulator_connected = False
+        self.text_edit_log.setMaximumBlockCount(log_view_max_lines)
+        self._pending_log: deque[str] = deque(maxlen=log_view_max_lines)
+        self._log_flush_timer = QTimer()
+        self._log_flush_timer.setSingleShot(True)
+        self._log_flush_timer.setInterval(log_flush_interval)
+        self._log_flush_timer.timeout.connect(self._flush_log)
         signals.log_message.connect(self.log_message)
 
-        voice_client.voice_data_sent.connect(self.tx_send)
-        voice_client.voice_data_received.connect(self.rx_receive)
-        self.last_data_receive = 0
-        self.receive_timeout_timer = QTimer()
-        self.receive_timeout_timer.timeout.connect(self.check_rx_timeout)
-        self.receive_timeout_timer.start(50)
-        self.last_data_send = 0
-        self.send_timeout_timer = QTimer()
-        self.send_timeout_timer.timeout.connect(self.check_tx_timeout)
-        self.send_timeout_timer.start(50)
+        voice_client.talk_state.talk_started.connect(self.talk_started)
+        voice_client.talk_state.talk_stopped.connect(self.talk_stopped)
+        # speaker rows are refreshed from snapshots at a fixed rate while anyone is talking
+        self._speaker_timer = QTimer()
+        self._speaker_timer.setInterval(active_speaker_refresh_interval)
+        self._speaker_timer.timeout.connect(self.update_active_speakers)
+
+        self.level_tx = LevelBar(self)
+        self.level_rx = LevelBar(self)
+        self.layout_connect.addWidget(self.level_tx, 1, 5, 1, 1)
+        self.layout_connect.addWidget(self.level_rx, 2, 5, 1, 1)
+        self._level_timer = QTimer()
+        self._level_timer.setInterval(level_meter_interval)
+        self._level_timer.timeout.connect(self.update_levels)
 
         self._connected = False
         self.signals = signals
 
-    def check_rx_timeout(self):
-        if self.button_rx.is_active:
-            if time() - self.last_data_receive > (default_frame_time / 1000):
-                self.button_rx.set_active(False)
+    def _create_fsuipc_client(self) -> FSUIPCClient:
+        try:
+            return FSUIPCClient(join(getcwd(), "libfsuipc.dll"))
+        except FileNotFoundError:
+            logger.error("Cannot find libfsuipc.dll")
+            QMessageBox.critical(self, "Cannot load libfsuipc.dll",
+                                 f"Cannot found libfsuipc.dll, download it and put it under {getcwd()}")
+            exit(1)
+        except Exception as e:
+            logger.error(f"Fail to load libfsuipc.dll, {e}")
+            QMessageBox.critical(self, "Cannot load libfsuipc.dll",
+                                 "Unknown error occurred while loading libfsuipc.dll")
+            exit(1)
 
-    def check_tx_timeout(self):
-        if self.button_tx.is_active:
-            if time() - self.last_data_send > (default_frame_time / 1000):
-                self.button_tx.set_active(False)
+    def _create_fake_fsuipc_client(self) -> FSUIPCClient:
+        try:
+            if config.fsuipc_timeline:
+                fsuipc_lib = FakeFSUIPCLibrary.from_file(config.fsuipc_timeline)
+            else:
+                fsuipc_lib = FakeFSUIPCLibrary()
+        except Exception as e:
+            logger.error(f"Fail to load FSUIPC timeline {config.fsuipc_timeline}, {e}")
+            QMessageBox.critical(self, "Cannot load FSUIPC timeline",
+                                 f"Error occurred while loading {config.fsuipc_timeline}")
+            exit(1)
+        logger.warning("Using fake FSUIPC backend")
+        return FSUIPCClient(fsuipc_lib)
 
-    def tx_send(self) -> None:
-        if self.voice_client.connection_state != ConnectionState.READY:
-            self.button_tx.set_active(False)
+    def talk_started(self, stream: TalkStream) -> None:
+        if stream.sent:
+            self.button_tx.set_active(True)
             return
-        self.last_data_send = time()
-        self.button_tx.set_active(True)
+        self.button_rx.set_active(True)
+        if not self._speaker_timer.isActive():
+            self.update_active_speakers()
+            self._speaker_timer.start()
+
+    def talk_stopped(self, stream: TalkStream) -> None:
+        active_streams = self.voice_client.talk_state.active_streams
+        if stream.sent:
+            self.button_tx.set_active(any(active.sent for active in active_streams))
+        else:
+            self.button_rx.set_active(any(not active.sent for active in active_streams))
+
+    def update_levels(self) -> None:
+        input_meter = self.voice_client.input_meter
+        if input_meter is not None:
+            self.level_tx.set_level(*input_meter.level)
+        rms = peak = 0.0
+        for meter in self.voice_client.playback_meters.values():
+            meter_rms, meter_peak = meter.level
+            rms = max(rms, meter_rms)
+            peak = max(peak, meter_peak)
+        self.level_rx.set_level(rms, peak)
 
-    def rx_receive(self, voice: VoicePacket) -> None:
-        if self.voice_client.connection_state != ConnectionState.READY:
-            self.button_rx.set_active(False)
+    def update_active_speakers(self) -> None:
+        speakers = self.voice_client.talk_state.snapshot(sent=False)
+        if not speakers:
+            self.table_speakers.setRowCount(0)
+            self._speaker_timer.stop()
             return
-        self.last_data_receive = time()
-        self.button_rx.set_active(True)
-        self.label_rx_callsign_v.setText(voice.callsign)
-        self.label_rx_freq_v.setText(f"{voice.frequency / 1000:.3f}")
+        if self.table_speakers.rowCount() != len(speakers):
+            self.table_speakers.setRowCount(len(speakers))
+        for row, speaker in enumerate(speakers):
+            stream = speaker.stream
+            texts = (stream.callsign, f"{stream.frequency / 1000:.3f}", f"{speaker.duration:.0f}s")
+            for column, text in enumerate(texts):
+                item = self.table_speakers.item(row, column)
+                if item is None:
+                    item = QTableWidgetItem()
+                    self.table_speakers.setItem(row, column, item)
+                if item.text() != text:
+                    item.setText(text)
+            self.table_speakers.item(row, 0).setToolTip(f"CID {stream.cid:04}")
+
+    def allow_connect_without_audio(self) -> None:
+        # audio failed to initialize and the user chose to go on, received packets are still recorded
+        self.button_connect.setEnabled(True)
+        self.log_message("AudioHandler", "WARNING", "音频设备不可用, 仅接收")
 
     def login_success(self):
         if self.voice_client.cid is None:
@@ -107,7 +172,7 @@ class ConnectWindow(QWidget, Ui_ConnectWindow):
     def connect_to_server(self):
         if self._connected:
             self.voice_client.disconnect()
-            self.client_window.stop()
+            self.disconnect_from_simulator()
             self._connected = False
             return
 
@@ -138,45 +203,52 @@ class ConnectWindow(QWidget, Ui_ConnectWindow):
             self.button_connect.setText("断开连接")
             self._connected = True
             self.label_callsign_v.setText(self.voice_client.callsign)
+            self._level_timer.start()
             if self.voice_client.is_atc:
                 self.windows.setCurrentIndex(1)
             else:
-                Thread(target=self.connect_to_simulator, daemon=True).start()
+                self.simulator_connector.start()
         elif state == ConnectionState.DISCONNECTED:
             self._connected = False
+            self._level_timer.stop()
+            self.level_tx.set_level(0, 0)
+            self.level_rx.set_level(0, 0)
+            self._speaker_timer.stop()
+            self.table_speakers.setRowCount(0)
+            self.disconnect_from_simulator()
             self.button_connect.setText("连接服务器")
             self.label_callsign_v.setText("----")
             self.windows.setCurrentIndex(0)
 
     def fsuipc_connect(self):
-        self.windows.setCurrentIndex(2)
-        self.signals.resize_window.emit(450, 600, True)
+        if not self._connected:
+            return
+        self._simulator_connected = True
+        if self.windows.currentIndex() != 2:
+            self.windows.setCurrentIndex(2)
+            self.signals.resize_window.emit(450, 600, True)
         self.client_window.start()
 
     def fsuipc_connection_fail(self):
         self.connect_to_server()
         QMessageBox.critical(self, "无法连接到模拟器", "无法连接到模拟器, 请检查FSUIPC/XPUIPC是否正确安装")
 
-    def connect_to_simulator(self):
-        retry = 0
-        max_retry = 12
-        retry_delay = 5
-        while retry < max_retry:
-            res = self.fsuipc_client.open_fsuipc_client()
-            if res.requestStatus:
-                logger.success("FSUIPC connection established")
-                self.log_message("FSUIPC", "INFO", "FSUIPC连接成功")
-                break
-            logger.error(f"FSUIPC connection failed, {retry + 1}/{max_retry} times")
-            self.log_message("FSUIPC", "ERROR", f"FSUIPC连接失败, 第 {retry + 1}/{max_retry} 次尝试")
-            retry += 1
-            sleep(retry_delay)
-        if retry == max_retry:
-            logger.error(f"FSUIPC connection failed")
-            self.log_message("FSUIPC", "ERROR", "FSUIPC连接失败")
-            self.fsuipc_client_connect_fail.emit()
+    def fsuipc_connection_lost(self):
+        if not self._connected or not self._simulator_connected:
             return
-        self.fsuipc_client_connected.emit()
+        logger.warning("FSUIPC connection lost, reconnecting")
+        self.log_message("FSUIPC", "WARNING", "与模拟器的连接已断开, 正在重新连接")
+        self.client_window.stop()
+        self.fsuipc_client.close_fsuipc_client()
+        self._simulator_connected = False
+        self.simulator_connector.start(timeout=None)
+
+    def disconnect_from_simulator(self):
+        self.simulator_connector.cancel()
+        self.client_window.stop()
+        if self._simulator_connected:
+            self.fsuipc_client.close_fsuipc_client()
+            self._simulator_connected = False
 
     def handle_connect_error(self, message: str) -> None:
         QMessageBox.critical(self, "连接服务器失败", message)
@@ -185,7 +257,15 @@ class ConnectWindow(QWidget, Ui_ConnectWindow):
         self.windows.setCurrentIndex(0)
 
     def log_message(self, name: str, level: str, message: str) -> None:
-        self.text_browser_log.append(
-            f"{datetime.now().strftime('%H:%M:%S')} | {name} | {level.upper()} | {message}")
-        cursor = self.text_browser_log.textCursor()
-        self.text_browser_log.moveCursor(cursor.MoveOperation.End)
+        self._pending_log.append(f"{datetime.now().strftime('%H:%M:%S')} | {name} | {level.upper()} | {message}")
+        if not self._log_flush_timer.isActive():
+            self._log_flush_timer.start()
+
+    def _flush_log(self) -> None:
+        if not self._pending_log:
+            return
+        # one append per burst, the widget drops old lines past its maximum block count
+        self.text_edit_log.appendPlainText("\n".join(self._pending_log))
+        self._pending_log.clear()
+        scroll_bar = self.text_edit_log.verticalScrollBar()
+        scroll_bar.setValue(scroll_bar.maximum())
@@ -24,8 +24,10 @@ class ControllerWindow(QWidget, Ui_ControllerWindow):
         self.button_freq_tx.clicked.connect(self.freq_tx_click)
         self.button_freq_rx.clicked.connect(self.freq_rx_click)
         voice_client.connection_state_changed.connect(self.connect_state_changed)
+        voice_client.transmitters_changed.connect(self.transmitters_changed)
         voice_client.update_current_frequency.connect(
-            lambda x: self.label_current_freq_v.setText(f"{x / 1000:.3f}" if x != 0 else "---.---")
+            lambda x: self.label_current_freq_v.setText(
+                " ".join(f"{frequency / 1000:.3f}" for frequency in x) if x else "---.---")
         )
         self._frequency = -1
         self.line_edit_freq.textChanged.connect(self.decode_frequency)
@@ -33,10 +35,13 @@ class ControllerWindow(QWidget, Ui_ControllerWindow):
     def decode_frequency(self, text: str):
         if frequency_pattern.match(text) is not None:
             self._frequency = int(float(text) * 1000)
+            self.voice_client.set_transmitter_frequency(3, self._frequency)
             self.button_freq_rx.setEnabled(True)
             self.button_freq_tx.setEnabled(True)
         else:
             self._frequency = -1
+            self.voice_client.set_transmitter_frequency(3, 0)
+            self.voice_client.remove_transmit_frequency(3)
             self.button_freq_rx.selected = False
             self.button_freq_tx.selected = False
             self.button_freq_rx.setEnabled(False)
@@ -45,60 +50,57 @@ class ControllerWindow(QWidget, Ui_ControllerWindow):
 
     def freq_tx_click(self):
         clear_error(self.line_edit_freq)
-        self.button_emer_freq_tx.selected = False
-        self.button_main_freq_tx.selected = False
-        self.button_unicom_freq_tx.selected = False
         if self.button_freq_tx.selected:
-            self.voice_client.switch_frequency(self._frequency, 3)
+            self.voice_client.add_transmit_frequency(self._frequency, 3)
         else:
-            self.voice_client.clear_frequency()
+            self.voice_client.remove_transmit_frequency(3)
 
     def freq_rx_click(self):
         self.voice_client.set_transmitter_receive_flag(self._frequency,
                                                        self.button_freq_rx.selected)
 
     def main_freq_tx_click(self):
-        self.button_freq_tx.selected = False
-        self.button_emer_freq_tx.selected = False
-        self.button_unicom_freq_tx.selected = False
         if self.button_main_freq_tx.selected:
-            self.voice_client.switch_frequency(self.voice_client.main_frequency, 0)
+            self.voice_client.add_transmit_frequency(self.voice_client.main_frequency, 0)
         else:
-            self.voice_client.clear_frequency()
+            self.voice_client.remove_transmit_frequency(0)
 
     def main_freq_rx_click(self):
         self.voice_client.set_transmitter_receive_flag(self.voice_client.main_frequency,
                                                        self.button_main_freq_rx.selected)
 
     def unicom_freq_tx_click(self):
-        self.button_freq_tx.selected = False
-        self.button_emer_freq_tx.selected = False
-        self.button_main_freq_tx.selected = False
         if self.button_unicom_freq_tx.selected:
-            self.voice_client.switch_frequency(122800, 1)
+            self.voice_client.add_transmit_frequency(122800, 1)
         else:
-            self.voice_client.clear_frequency()
+            self.voice_client.remove_transmit_frequency(1)
 
     def unicom_freq_rx_click(self):
         self.voice_client.set_transmitter_receive_flag(122800, self.button_unicom_freq_rx.selected)
 
     def emer_freq_tx_click(self):
-        self.button_freq_tx.selected = False
-        self.button_main_freq_tx.selected = False
-        self.button_unicom_freq_tx.selected = False
         if self.button_emer_freq_tx.selected:
-            self.voice_client.switch_frequency(121500, 2)
+            self.voice_client.add_transmit_frequency(121500, 2)
         else:
-            self.voice_client.clear_frequency()
+            self.voice_client.remove_transmit_frequency(2)
 
     def emer_freq_rx_click(self):
         self.voice_client.set_transmitter_receive_flag(121500, self.button_emer_freq_rx.selected)
 
+    def transmitters_changed(self, transmitters: list[int]):
+        self.button_main_freq_tx.selected = 0 in transmitters
+        self.button_unicom_freq_tx.selected = 1 in transmitters
+        self.button_emer_freq_tx.selected = 2 in transmitters
+        self.button_freq_tx.selected = 3 in transmitters
+
     def connect_state_changed(self, state: ConnectionState):
         if not self.voice_client.is_atc:
             return
         if state == ConnectionState.READY:
             self.label_main_freq_v.setText(f"{self.voice_client.main_frequency / 1000:.3f}")
+            self.voice_client.set_transmitter_frequency(0, self.voice_client.main_frequency)
+            self.voice_client.set_transmitter_frequency(1, 122800)
+            self.voice_client.set_transmitter_frequency(2, 121500)
             self.button_main_freq_rx.selected = True
             self.button_unicom_freq_rx.selected = True
             self.button_emer_freq_rx.selected = True
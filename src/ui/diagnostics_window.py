@@ -0,0 +1,62 @@
+from time import monotonic
+from typing import Optional
+
+from PySide6.QtCore import QTimer
+from PySide6.QtWidgets import QTableWidgetItem, QWidget
+
+from .form import Ui_DiagnosticsWindow
+from src.constants import diagnostics_refresh_interval
+from src.utils.metrics import MetricSnapshot, metrics
+
+
+class DiagnosticsWindow(QWidget, Ui_DiagnosticsWindow):
+    def __init__(self):
+        super().__init__()
+        self.setupUi(self)
+        self._timer = QTimer()
+        self._timer.setInterval(diagnostics_refresh_interval)
+        self._timer.timeout.connect(self.refresh)
+        self._last_values: dict[str, float] = {}
+        self._last_refresh: Optional[float] = None
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self._timer.start()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self._timer.stop()
+
+    def _format(self, snapshot: MetricSnapshot, elapsed: Optional[float]) -> str:
+        seconds = snapshot.name.endswith("_seconds") or snapshot.name.endswith("_seconds_total")
+        if snapshot.type == "histogram":
+            count = snapshot.count
+            if count == 0:
+                return "-"
+            scale, unit = (1000, "ms") if seconds else (1, "")
+            return (f"n={count}  avg={snapshot.value / count * scale:.2f}{unit}  "
+                    f"p50≤{snapshot.quantile(0.5) * scale:g}{unit}  p99≤{snapshot.quantile(0.99) * scale:g}{unit}")
+        text = f"{snapshot.value:g}"
+        if snapshot.type == "counter" and elapsed:
+            rate = (snapshot.value - self._last_values.get(snapshot.name, snapshot.value)) / elapsed
+            text += f"  ({rate * 100:.1f}%)" if seconds else f"  ({rate:.1f}/s)"
+        return text
+
+    def refresh(self):
+        now = monotonic()
+        elapsed = None if self._last_refresh is None else now - self._last_refresh
+        snapshots = metrics.snapshot()
+        if self.table_metrics.rowCount() != len(snapshots):
+            self.table_metrics.setRowCount(len(snapshots))
+        for row, snapshot in enumerate(snapshots):
+            for column, text in enumerate((snapshot.name, self._format(snapshot, elapsed))):
+                item = self.table_metrics.item(row, column)
+                if item is None:
+                    item = QTableWidgetItem()
+                    self.table_metrics.setItem(row, column, item)
+                if item.text() != text:
+                    item.setText(text)
+            self.table_metrics.item(row, 0).setToolTip(snapshot.help)
+            self._last_values[snapshot.name] = snapshot.value
+        self._last_refresh = now
@@ -15,9 +15,10 @@ from PySide6.QtGui import (QBrush, QColor, QConicalGradient, QCursor,
     QFont, QFontDatabase, QGradient, QIcon,
     QImage, QKeySequence, QLinearGradient, QPainter,
     QPalette, QPixmap, QRadialGradient, QTransform)
-from PySide6.QtWidgets import (QApplication, QGridLayout, QLabel, QLayout,
-    QLineEdit, QPushButton, QSizePolicy, QStackedWidget,
-    QTextBrowser, QWidget)
+from PySide6.QtWidgets import (QAbstractItemView, QApplication, QGridLayout, QHeaderView,
+    QLabel, QLayout, QLineEdit, QPlainTextEdit,
+    QPushButton, QSizePolicy, QStackedWidget, QTableWidget,
+    QTableWidgetItem, QWidget)
 
 from src.ui.component.indicator_button import IndicatorButton
 
@@ -158,39 +159,35 @@ class Ui_ConnectWindow(object):
 
         self.layout_connect.addWidget(self.button_tx, 1, 4, 1, 1)
 
-        self.layout_info = QGridLayout()
-        self.layout_info.setObjectName(u"layout_info")
-        self.label_rx_callsign = QLabel(ConnectWindow)
-        self.label_rx_callsign.setObjectName(u"label_rx_callsign")
-
-        self.layout_info.addWidget(self.label_rx_callsign, 0, 0, 1, 1)
-
-        self.label_rx_callsign_v = QLabel(ConnectWindow)
-        self.label_rx_callsign_v.setObjectName(u"label_rx_callsign_v")
-
-        self.layout_info.addWidget(self.label_rx_callsign_v, 0, 1, 1, 1)
-
-        self.label_rx_freq = QLabel(ConnectWindow)
-        self.label_rx_freq.setObjectName(u"label_rx_freq")
-
-        self.layout_info.addWidget(self.label_rx_freq, 0, 2, 1, 1)
-
-        self.label_rx_freq_v = QLabel(ConnectWindow)
-        self.label_rx_freq_v.setObjectName(u"label_rx_freq_v")
-
-        self.layout_info.addWidget(self.label_rx_freq_v, 0, 3, 1, 1)
-
-
-        self.layout_connect.addLayout(self.layout_info, 3, 0, 1, 3)
+        self.table_speakers = QTableWidget(ConnectWindow)
+        if (self.table_speakers.columnCount() < 3):
+            self.table_speakers.setColumnCount(3)
+        __qtablewidgetitem = QTableWidgetItem()
+        self.table_speakers.setHorizontalHeaderItem(0, __qtablewidgetitem)
+        __qtablewidgetitem1 = QTableWidgetItem()
+        self.table_speakers.setHorizontalHeaderItem(1, __qtablewidgetitem1)
+        __qtablewidgetitem2 = QTableWidgetItem()
+        self.table_speakers.setHorizontalHeaderItem(2, __qtablewidgetitem2)
+        self.table_speakers.setObjectName(u"table_speakers")
+        self.table_speakers.setMaximumSize(QSize(16777215, 120))
+        self.table_speakers.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table_speakers.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        self.table_speakers.setColumnCount(3)
+        self.table_speakers.horizontalHeader().setStretchLastSection(True)
+        self.table_speakers.verticalHeader().setVisible(False)
+
+        self.layout_connect.addWidget(self.table_speakers, 3, 0, 1, 3)
 
 
         self.gridLayout.addLayout(self.layout_connect, 0, 0, 1, 1)
 
-        self.text_browser_log = QTextBrowser(ConnectWindow)
-        self.text_browser_log.setObjectName(u"text_browser_log")
-        self.text_browser_log.setMaximumSize(QSize(16777215, 100))
+        self.text_edit_log = QPlainTextEdit(ConnectWindow)
+        self.text_edit_log.setObjectName(u"text_edit_log")
+        self.text_edit_log.setMaximumSize(QSize(16777215, 100))
+        self.text_edit_log.setUndoRedoEnabled(False)
+        self.text_edit_log.setReadOnly(True)
 
-        self.gridLayout.addWidget(self.text_browser_log, 3, 0, 1, 2)
+        self.gridLayout.addWidget(self.text_edit_log, 3, 0, 1, 2)
 
 
         self.retranslateUi(ConnectWindow)
@@ -211,9 +208,11 @@ class Ui_ConnectWindow(object):
         self.button_rx.setText(QCoreApplication.translate("ConnectWindow", u"RX", None))
         self.label_address.setText(QCoreApplication.translate("ConnectWindow", u"\u670d\u52a1\u5668\u5730\u5740", None))
         self.button_tx.setText(QCoreApplication.translate("ConnectWindow", u"TX", None))
-        self.label_rx_callsign.setText(QCoreApplication.translate("ConnectWindow", u"\u53d1\u8a00\u4eba\u547c\u53f7", None))
-        self.label_rx_callsign_v.setText(QCoreApplication.translate("ConnectWindow", u"---.---", None))
-        self.label_rx_freq.setText(QCoreApplication.translate("ConnectWindow", u"\u63a5\u6536\u9891\u7387", None))
-        self.label_rx_freq_v.setText(QCoreApplication.translate("ConnectWindow", u"---.---", None))
+        ___qtablewidgetitem = self.table_speakers.horizontalHeaderItem(0)
+        ___qtablewidgetitem.setText(QCoreApplication.translate("ConnectWindow", u"\u53d1\u8a00\u4eba\u547c\u53f7", None));
+        ___qtablewidgetitem1 = self.table_speakers.horizontalHeaderItem(1)
+        ___qtablewidgetitem1.setText(QCoreApplication.translate("ConnectWindow", u"\u63a5\u6536\u9891\u7387", None));
+        ___qtablewidgetitem2 = self.table_speakers.horizontalHeaderItem(2)
+        ___qtablewidgetitem2.setText(QCoreApplication.translate("ConnectWindow", u"\u65f6\u957f", None));
     # retranslateUi
 
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+################################################################################
+## Form generated from reading UI file 'diagnostics_window.ui'
+##
+## Created by: Qt User Interface Compiler version 6.9.1
+##
+## WARNING! All changes made in this file will be lost when recompiling UI file!
+################################################################################
+
+from PySide6.QtCore import (QCoreApplication, QDate, QDateTime, QLocale,
+    QMetaObject, QObject, QPoint, QRect,
+    QSize, QTime, QUrl, Qt)
+from PySide6.QtGui import (QBrush, QColor, QConicalGradient, QCursor,
+    QFont, QFontDatabase, QGradient, QIcon,
+    QImage, QKeySequence, QLinearGradient, QPainter,
+    QPalette, QPixmap, QRadialGradient, QTransform)
+from PySide6.QtWidgets import (QAbstractItemView, QApplication, QGridLayout, QHeaderView,
+    QSizePolicy, QTableWidget, QTableWidgetItem, QWidget)
+import resource_rc
+
+class Ui_DiagnosticsWindow(object):
+    def setupUi(self, DiagnosticsWindow):
+        if not DiagnosticsWindow.objectName():
+            DiagnosticsWindow.setObjectName(u"DiagnosticsWindow")
+        DiagnosticsWindow.resize(520, 480)
+        font = QFont()
+        font.setFamilies([u"Leelawadee UI"])
+        font.setPointSize(10)
+        DiagnosticsWindow.setFont(font)
+        icon = QIcon()
+        icon.addFile(u":/icon/logo", QSize(), QIcon.Mode.Normal, QIcon.State.Off)
+        DiagnosticsWindow.setWindowIcon(icon)
+        self.gridLayout = QGridLayout(DiagnosticsWindow)
+        self.gridLayout.setObjectName(u"gridLayout")
+        self.table_metrics = QTableWidget(DiagnosticsWindow)
+        if (self.table_metrics.columnCount() < 2):
+            self.table_metrics.setColumnCount(2)
+        __qtablewidgetitem = QTableWidgetItem()
+        self.table_metrics.setHorizontalHeaderItem(0, __qtablewidgetitem)
+        __qtablewidgetitem1 = QTableWidgetItem()
+        self.table_metrics.setHorizontalHeaderItem(1, __qtablewidgetitem1)
+        self.table_metrics.setObjectName(u"table_metrics")
+        self.table_metrics.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table_metrics.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table_metrics.setColumnCount(2)
+        self.table_metrics.horizontalHeader().setStretchLastSection(True)
+        self.table_metrics.verticalHeader().setVisible(False)
+
+        self.gridLayout.addWidget(self.table_metrics, 0, 0, 1, 1)
+
+
+        self.retranslateUi(DiagnosticsWindow)
+
+        QMetaObject.connectSlotsByName(DiagnosticsWindow)
+    # setupUi
+
+    def retranslateUi(self, DiagnosticsWindow):
+        DiagnosticsWindow.setWindowTitle(QCoreApplication.translate("DiagnosticsWindow", u"\u8bca\u65ad", None))
+        ___qtablewidgetitem = self.table_metrics.horizontalHeaderItem(0)
+        ___qtablewidgetitem.setText(QCoreApplication.translate("DiagnosticsWindow", u"\u540d\u79f0", None));
+        ___qtablewidgetitem1 = self.table_metrics.horizontalHeaderItem(1)
+        ___qtablewidgetitem1.setText(QCoreApplication.translate("DiagnosticsWindow", u"\u503c", None));
+    # retranslateUi
+
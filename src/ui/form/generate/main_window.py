@@ -37,6 +37,8 @@ class Ui_MainWindow(object):
         icon1 = QIcon()
         icon1.addFile(u":/icon/setting", QSize(), QIcon.Mode.Normal, QIcon.State.Off)
         self.action_settings.setIcon(icon1)
+        self.action_diagnostics = QAction(MainWindow)
+        self.action_diagnostics.setObjectName(u"action_diagnostics")
         self.action_about = QAction(MainWindow)
         self.action_about.setObjectName(u"action_about")
         self.action_about_qt = QAction(MainWindow)
@@ -71,6 +73,7 @@ class Ui_MainWindow(object):
         self.menubar.addAction(self.menu_file.menuAction())
         self.menubar.addAction(self.menu_help.menuAction())
         self.menu_file.addAction(self.action_settings)
+        self.menu_file.addAction(self.action_diagnostics)
         self.menu_help.addAction(self.action_about)
         self.menu_help.addAction(self.action_about_qt)
 
@@ -85,6 +88,7 @@ class Ui_MainWindow(object):
     def retranslateUi(self, MainWindow):
         MainWindow.setWindowTitle(QCoreApplication.translate("MainWindow", u"AudioClient", None))
         self.action_settings.setText(QCoreApplication.translate("MainWindow", u"\u9996\u9009\u9879", None))
+        self.action_diagnostics.setText(QCoreApplication.translate("MainWindow", u"\u8bca\u65ad", None))
         self.action_about.setText(QCoreApplication.translate("MainWindow", u"\u5173\u4e8e", None))
         self.action_about_qt.setText(QCoreApplication.translate("MainWindow", u"\u5173\u4e8eQt", None))
         self.menu_file.setTitle(QCoreApplication.translate("MainWindow", u"\u6587\u4ef6", None))
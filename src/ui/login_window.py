@@ -1,5 +1,3 @@
-from urllib.parse import urljoin
-
 from PySide6.QtWidgets import QMessageBox, QWidget
 from loguru import logger
 
@@ -9,6 +7,7 @@ from src.utils import http
 from src.signal import Signals
 from src.core import VoiceClient
 from src.utils import get_line_edit_data
+from src.utils.login import login
 
 
 class LoginWindow(QWidget, Ui_LoginWindow):
@@ -48,23 +47,13 @@ class LoginWindow(QWidget, Ui_LoginWindow):
             QMessageBox.critical(self, "参数错误", "请输入账号和密码")
             return
 
-        response = http.client.post(urljoin(config.base_url, "/api/users/sessions"), json={
-            "username": account,
-            "password": password
-        })
-
-        if response.status_code != 200:
-            logger.error(f"Login failed with status code {response.status_code}")
-            try:
-                QMessageBox.critical(self, "登陆失败", response.json().get("message"))
-            except Exception as _:
-                QMessageBox.critical(self, "登陆失败", "发生未知错误")
+        result = login(http.client, config.base_url, account, password)
+        if not result.success:
+            QMessageBox.critical(self, "登陆失败", result.message)
             return
 
-        data = response.json()["data"]
-
-        self.voice_client.cid = data["user"]["cid"]
-        self.voice_client.jwt_token = data["token"]
+        self.voice_client.cid = result.cid
+        self.voice_client.jwt_token = result.token
 
         logger.success(f"Logged in successfully")
         logger.trace(f"Logged in as {account}, cid={self.voice_client.cid}, token={self.voice_client.jwt_token}")
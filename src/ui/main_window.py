@@ -1,22 +1,28 @@
-from typing import Optional
+from typing import Optional, TYPE_CHECKING
 
 from PySide6.QtGui import QScreen
-from PySide6.QtWidgets import QApplication, QMainWindow
+from PySide6.QtWidgets import QApplication, QMainWindow, QMessageBox
 from loguru import logger
 
 from .form import Ui_MainWindow
-from .component import PTTButton
 from .config_window import ConfigWindow
 from .connect_window import ConnectWindow
+from .diagnostics_window import DiagnosticsWindow
 from .loading_window import LoadingWindow
 from .login_window import LoginWindow
-from src.constants import app_title
+from src.constants import app_title, ptt_binding_frequency, ptt_binding_transmitter
 from src.utils import http
 from src.model import ConnectionState
 from src.config import config
-from src.thread import KeyboardListenerThread, MouseListenerThread
+from src.thread import KeyboardListenerThread, MouseListenerThread, parse_key
 from src.core import VoiceClient
+from src.core.audio_warmup import AudioWarmup
+from src.core.ptt_controller import PTTTarget
 from src.signal import Signals, MouseSignals, KeyBoardSignals, AudioSignal
+from src.startup_profiler import startup_profiler
+
+if TYPE_CHECKING:
+    from src.core.audio_handler import AudioHandler
 
 
 class MainWindow(QMainWindow, Ui_MainWindow):
@@ -37,7 +43,8 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.connect: Optional[ConnectWindow] = None
         self.login: Optional[LoginWindow] = None
         self.config: Optional[ConfigWindow] = None
-        self.ptt_button: Optional[PTTButton] = None
+        self.diagnostics: Optional[DiagnosticsWindow] = None
+        self.audio_warmup = AudioWarmup(audio_signal)
 
         self.loading = LoadingWindow()
         self.loading.setObjectName(u"loading")
@@ -54,6 +61,7 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         http.initialize()
         http.client_initialized.connect(self.initialize_complete)
         self.action_settings.triggered.connect(self.show_config_window)
+        self.action_diagnostics.triggered.connect(self.show_diagnostics_window)
         signals.show_config_windows.connect(self.show_config_window)
         signals.logout_request.connect(self.logout_request)
         signals.resize_window.connect(self.resize_window)
@@ -65,12 +73,34 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.windows.setCurrentIndex(2)
 
     def config_update(self) -> None:
-        self.ptt_button.set_target_key(config.ptt_key)
+        bindings = {}
+        ptt_key = parse_key(config.ptt_key)
+        if ptt_key is None:
+            logger.warning(f"Unknown ptt key: {config.ptt_key}")
+        else:
+            bindings[ptt_key] = None
+        for key_name, target in config.ptt_bindings.items():
+            key = parse_key(key_name)
+            if key is None:
+                logger.warning(f"Unknown ptt binding key: {key_name}")
+                continue
+            if (not isinstance(target, dict) or
+                    target.get("type") not in (ptt_binding_transmitter, ptt_binding_frequency) or
+                    not isinstance(target.get("value"), int)):
+                logger.warning(f"Invalid ptt binding for {key_name}: {target}, "
+                               f"expect {{\"type\": \"transmitter\" | \"frequency\", \"value\": int}}")
+                continue
+            bindings[key] = PTTTarget(target["type"], target["value"])
+        self.voice_client.ptt_controller.set_bindings(bindings)
+
+    def replay_key_pressed(self, key: str) -> None:
+        if config.replay_key and key == config.replay_key:
+            self.voice_client.replay_last_transmission()
 
     def initialize_complete(self) -> None:
         self.setMinimumSize(0, 0)
 
-        self.voice_client = VoiceClient(self.signals, self.audio_signal)
+        self.voice_client = VoiceClient(self.signals, self.audio_signal, enable_audio=False)
 
         self.login = LoginWindow(self.voice_client, self.signals)
         self.login.setObjectName(u"login")
@@ -80,28 +110,28 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.connect.setObjectName(u"connect")
         self.windows.addWidget(self.connect)
 
-        self.config = ConfigWindow(self.audio_signal)
+        self.diagnostics = DiagnosticsWindow()
+        self.diagnostics.setObjectName(u"diagnostics")
+
+        # devices are filled in once the audio warm-up is done
+        with startup_profiler.span("config_window"):
+            self.config = ConfigWindow(self.audio_signal)
         self.config.setObjectName(u"config")
+        self.config.button_ptt.mouse_signal = self.mouse_signals
+        self.config.button_ptt.keyboard_signal = self.keyboard_signals
 
         self.signals.login_success.connect(self.login_success)
         self.signals.login_success.connect(self.connect.login_success)
 
-        self.mouse_listener = MouseListenerThread(self.mouse_signals)
-        self.keyboard_listener = KeyboardListenerThread(self.keyboard_signals)
+        self.mouse_listener = MouseListenerThread(self.mouse_signals, self.voice_client.ptt_controller)
+        self.keyboard_listener = KeyboardListenerThread(self.keyboard_signals, self.voice_client.ptt_controller)
 
         self.mouse_listener.start()
         self.keyboard_listener.start()
 
-        self.config.button_ptt.mouse_signal = self.mouse_signals
-        self.config.button_ptt.keyboard_signal = self.keyboard_signals
-
-        self.ptt_button = PTTButton()
         self.config_update()
-        self.mouse_signals.mouse_clicked.connect(self.ptt_button.key_pressed)
-        self.keyboard_signals.key_pressed.connect(self.ptt_button.key_pressed)
-        self.mouse_signals.mouse_released.connect(self.ptt_button.key_released)
-        self.keyboard_signals.key_released.connect(self.ptt_button.key_released)
-        self.ptt_button.ptt_pressed.connect(lambda x: self.audio_signal.ptt_status_change.emit(x))
+        self.keyboard_signals.key_pressed.connect(self.replay_key_pressed)
+        self.mouse_signals.mouse_clicked.connect(self.replay_key_pressed)
         self.voice_client.connection_state_changed.connect(self.handle_connect_status_change)
 
         self.menubar.setVisible(True)
@@ -109,6 +139,28 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.center()
         self.windows.setCurrentIndex(1)
         self.loading.stop_animation()
+        startup_profiler.mark("login_shown")
+
+        # the login screen is usable while audio libraries load in the background
+        self.audio_warmup.finished.connect(self.audio_initialized)
+        self.audio_warmup.failed.connect(self.audio_initialize_failed)
+        self.audio_warmup.start()
+
+    def audio_initialized(self, audio: "AudioHandler") -> None:
+        self.voice_client.attach_audio(audio)
+        self.config.attach_devices(audio.device_registry)
+
+    def audio_initialize_failed(self, message: str) -> None:
+        button = QMessageBox.critical(self, "音频初始化失败",
+                                      f"{message}\n\n重试, 或忽略并在没有音频设备的情况下连接 (仅接收和录音, 不播放也无法发射)",
+                                      QMessageBox.StandardButton.Retry | QMessageBox.StandardButton.Ignore,
+                                      QMessageBox.StandardButton.Retry)
+        if button == QMessageBox.StandardButton.Retry:
+            logger.info("Retrying audio initialization")
+            self.audio_warmup.start()
+            return
+        logger.warning("Continuing without audio devices")
+        self.connect.allow_connect_without_audio()
 
     def center(self):
         screen = QScreen.availableGeometry(QApplication.primaryScreen()).center()
@@ -130,9 +182,17 @@ class MainWindow(QMainWindow, Ui_MainWindow):
                 self.setWindowTitle(f"{app_title} - 已就绪")
 
     def show_config_window(self) -> None:
+        if self.config is None:
+            return
         self.config.update_config_data()
         self.config.show()
 
+    def show_diagnostics_window(self) -> None:
+        if self.diagnostics is None:
+            return
+        self.diagnostics.show()
+        self.diagnostics.raise_()
+
     def resize_window(self, width: int, height: int, to_center: bool) -> None:
         self.resize(width, height)
         if to_center:
@@ -1,5 +1,22 @@
-from .http_client_manager import http_client_manager as http
-from .widget_utils import get_line_edit_data, show_error, clear_error
-from .utils import is_controller
-from .audio_utils import get_device_info, get_host_api_info
-from .qss_loader import QSSLoader
+from importlib import import_module
+
+# name -> (submodule, attribute). Resolved on first use so that importing one light submodule,
+# e.g. src.utils.file_utils from the core, doesn't drag in httpx and the Qt widgets
+_exports: dict[str, tuple[str, str]] = {
+    "http": (".http_client_manager", "http_client_manager"),
+    "get_line_edit_data": (".widget_utils", "get_line_edit_data"),
+    "show_error": (".widget_utils", "show_error"),
+    "clear_error": (".widget_utils", "clear_error"),
+    "is_controller": (".utils", "is_controller"),
+    "QSSLoader": (".qss_loader", "QSSLoader"),
+    "metrics": (".metrics", "metrics"),
+}
+
+
+def __getattr__(name: str):
+    if name not in _exports:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module, attribute = _exports[name]
+    value = getattr(import_module(module, __name__), attribute)
+    globals()[name] = value
+    return value
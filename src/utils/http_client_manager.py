@@ -1,11 +1,12 @@
 from threading import Thread
-from time import time
 from typing import Optional
 
 from PySide6.QtCore import QObject, Signal
 from httpx import Client, Request, Response
 from loguru import logger
 
+from src.startup_profiler import startup_profiler
+
 
 class HttpClientManger(QObject):
     client_initialized: Signal = Signal()
@@ -27,15 +28,15 @@ class HttpClientManger(QObject):
         logger.trace(f"Received http response: {request.method} {request.url} - Status {response.status_code}")
 
     def _initialize(self):
-        start_time = time()
         logger.trace("Initializing http client")
 
-        self._http_client = Client(event_hooks={
-            "request": [HttpClientManger._log_request],
-            "response": [HttpClientManger._log_response]
-        })
+        with startup_profiler.span("http_client") as span:
+            self._http_client = Client(event_hooks={
+                "request": [HttpClientManger._log_request],
+                "response": [HttpClientManger._log_response]
+            })
 
-        logger.trace(f"Initialize http client cost {time() - start_time:.6f}s")
+        logger.trace(f"Initialize http client cost {span.duration:.6f}s")
 
         self.client_initialized.emit()
 
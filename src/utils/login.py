@@ -0,0 +1,36 @@
+from dataclasses import dataclass
+from urllib.parse import urljoin
+
+from httpx import Client, HTTPError
+from loguru import logger
+
+
+@dataclass
+class LoginResult:
+    success: bool
+    message: str = ""
+    cid: int = 0
+    token: str = ""
+
+
+# shared by the login window and the headless client
+def login(client: Client, base_url: str, username: str, password: str) -> LoginResult:
+    try:
+        response = client.post(urljoin(base_url, "/api/users/sessions"), json={
+            "username": username,
+            "password": password
+        })
+    except HTTPError as e:
+        logger.error(f"Login request failed, {e}")
+        return LoginResult(False, "无法连接到服务器")
+
+    if response.status_code != 200:
+        logger.error(f"Login failed with status code {response.status_code}")
+        try:
+            message = response.json().get("message")
+        except Exception as _:
+            message = None
+        return LoginResult(False, message or "发生未知错误")
+
+    data = response.json()["data"]
+    return LoginResult(True, cid=data["user"]["cid"], token=data["token"])
@@ -0,0 +1,156 @@
+from bisect import bisect_left
+from dataclasses import dataclass
+from threading import Lock
+from time import process_time
+from typing import Callable, Optional, Union
+
+# seconds, sized for 10 ms audio frames up to network round trips
+default_buckets: tuple[float, ...] = (0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+
+
+# Metrics are written from audio and network threads without locking. Each one is expected to have a single
+# writer thread, readers only ever take snapshots, so a reader may see a histogram count one sample ahead of its sum.
+class Counter:
+    __slots__ = ("name", "help", "_value", "_function")
+    type = "counter"
+
+    def __init__(self, name: str, help_text: str, function: Optional[Callable[[], float]] = None):
+        self.name = name
+        self.help = help_text
+        self._value = 0
+        self._function = function
+
+    def inc(self, amount: Union[int, float] = 1) -> None:
+        self._value += amount
+
+    @property
+    def value(self) -> Union[int, float]:
+        if self._function is not None:
+            return self._function()
+        return self._value
+
+
+class Gauge:
+    __slots__ = ("name", "help", "_value", "_function")
+    type = "gauge"
+
+    def __init__(self, name: str, help_text: str, function: Optional[Callable[[], float]] = None):
+        self.name = name
+        self.help = help_text
+        self._value = 0.0
+        self._function = function
+
+    def set(self, value: float) -> None:
+        self._value = value
+
+    def inc(self, amount: float = 1) -> None:
+        self._value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self._value -= amount
+
+    @property
+    def value(self) -> float:
+        if self._function is not None:
+            return self._function()
+        return self._value
+
+
+class Histogram:
+    __slots__ = ("name", "help", "buckets", "_counts", "_sum")
+    type = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets: tuple[float, ...] = default_buckets):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(sorted(buckets))
+        # one extra slot for values above the last bucket
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self._counts[bisect_left(self.buckets, value)] += 1
+        self._sum += value
+
+    # cumulative count per upper bound, the last bound being +Inf
+    @property
+    def cumulative_counts(self) -> list[int]:
+        counts = list(self._counts)
+        for i in range(1, len(counts)):
+            counts[i] += counts[i - 1]
+        return counts
+
+    @property
+    def count(self) -> int:
+        return sum(self._counts)
+
+    @property
+    def sum(self) -> float:
+        return self._sum
+
+
+Metric = Union[Counter, Gauge, Histogram]
+
+
+@dataclass(frozen=True)
+class MetricSnapshot:
+    name: str
+    type: str
+    help: str
+    value: float
+    # histograms only: (upper bound, cumulative count) including +Inf
+    buckets: tuple[tuple[float, int], ...] = ()
+
+    @property
+    def count(self) -> int:
+        return self.buckets[-1][1] if self.buckets else 0
+
+    # upper bound of the bucket holding the q-th quantile
+    def quantile(self, q: float) -> float:
+        for bound, count in self.buckets:
+            if count >= q * self.count:
+                return bound
+        return 0.0
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: dict[str, Metric] = {}
+        self._lock = Lock()
+
+    def _register(self, name: str, factory: Callable[[], Metric]) -> Metric:
+        # registration happens once per metric at startup, updates never take the lock
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = factory()
+                self._metrics = {**self._metrics, name: metric}
+            return metric
+
+    def counter(self, name: str, help_text: str = "", function: Optional[Callable[[], float]] = None) -> Counter:
+        return self._register(name, lambda: Counter(name, help_text, function))
+
+    def gauge(self, name: str, help_text: str = "", function: Optional[Callable[[], float]] = None) -> Gauge:
+        return self._register(name, lambda: Gauge(name, help_text, function))
+
+    def histogram(self, name: str, help_text: str = "", buckets: tuple[float, ...] = default_buckets) -> Histogram:
+        return self._register(name, lambda: Histogram(name, help_text, buckets))
+
+    def snapshot(self) -> list[MetricSnapshot]:
+        result = []
+        for name, metric in sorted(self._metrics.items()):
+            if isinstance(metric, Histogram):
+                counts = metric.cumulative_counts
+                bounds = metric.buckets + (float("inf"),)
+                result.append(MetricSnapshot(name, metric.type, metric.help, metric.sum,
+                                             tuple(zip(bounds, counts))))
+            else:
+                result.append(MetricSnapshot(name, metric.type, metric.help, metric.value))
+        return result
+
+    def get(self, name: str) -> Optional[Metric]:
+        return self._metrics.get(name)
+
+
+metrics = MetricsRegistry()
+metrics.counter("process_cpu_seconds_total", "CPU time used by the client", process_time)
@@ -0,0 +1,123 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from math import isinf
+from os import replace
+from os.path import dirname
+from threading import Event, Thread
+from typing import Optional
+
+from loguru import logger
+
+from src.config import config
+from src.constants import metrics_export_http, metrics_export_textfile, metrics_prefix
+from .file_utils import check_directory
+from .metrics import MetricSnapshot, metrics
+
+
+def _format_value(value: float) -> str:
+    if isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def format_prometheus(snapshots: list[MetricSnapshot]) -> str:
+    lines = []
+    for snapshot in snapshots:
+        name = metrics_prefix + snapshot.name
+        if snapshot.help:
+            help_text = snapshot.help.replace("\\", "\\\\").replace("\n", "\\n")
+            lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {snapshot.type}")
+        if snapshot.type == "histogram":
+            for bound, count in snapshot.buckets:
+                lines.append(f'{name}_bucket{{le="{_format_value(bound)}"}} {count}')
+            lines.append(f"{name}_sum {_format_value(snapshot.value)}")
+            lines.append(f"{name}_count {snapshot.count}")
+        else:
+            lines.append(f"{name} {_format_value(snapshot.value)}")
+    lines.append("")
+    return "\n".join(lines)
+
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = format_prometheus(metrics.snapshot()).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.trace(f"Metrics request from {self.address_string()}: {format % args}")
+
+
+class MetricsExporter:
+    def __init__(self, mode: str, port: int, textfile: str, interval: float):
+        self._mode = mode
+        self._port = port
+        self._textfile = textfile
+        self._interval = interval
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._exit = Event()
+        self._thread: Optional[Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        if self._mode == metrics_export_http:
+            # only reachable from this machine, scrapers run next to the client
+            try:
+                self._server = ThreadingHTTPServer(("127.0.0.1", self._port), _MetricsRequestHandler)
+            except OSError as e:
+                logger.error(f"Failed to serve metrics on port {self._port}: {e}")
+                return
+            self._server.daemon_threads = True
+            self._thread = Thread(target=self._server.serve_forever, daemon=True)
+            logger.info(f"Serving metrics on http://127.0.0.1:{self._port}/metrics")
+        elif self._mode == metrics_export_textfile:
+            directory = dirname(self._textfile)
+            if directory:
+                check_directory(directory, create_if_not_exist=True)
+            self._exit.clear()
+            self._thread = Thread(target=self._write_loop, daemon=True)
+            logger.info(f"Writing metrics to {self._textfile}")
+        else:
+            logger.error(f"Unknown metrics export mode: {self._mode}")
+            return
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        self._exit.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _write_loop(self) -> None:
+        while True:
+            self.write_textfile()
+            if self._exit.wait(self._interval):
+                return
+
+    def write_textfile(self) -> None:
+        # write then rename so a collector never reads a half written file
+        temp_path = f"{self._textfile}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as file:
+                file.write(format_prometheus(metrics.snapshot()))
+            replace(temp_path, self._textfile)
+        except OSError as e:
+            logger.error(f"Failed to write metrics file {self._textfile}: {e}")
+
+
+def create_metrics_exporter() -> Optional[MetricsExporter]:
+    if not config.metrics_export:
+        return None
+    return MetricsExporter(config.metrics_export, config.metrics_port, config.metrics_textfile,
+                           config.metrics_textfile_interval)
@@ -0,0 +1,81 @@
+from importlib.metadata import PackageNotFoundError, version
+from importlib.util import find_spec
+from os import listdir
+from os.path import isdir, isfile, join
+from typing import Optional
+from xml.dom.minidom import parse
+
+from PySide6.QtCore import QDir
+from PySide6.QtGui import QColor, QFontDatabase, QGuiApplication, QPalette
+from PySide6.QtWidgets import QApplication
+from loguru import logger
+
+from .qss_loader import QSSLoader
+
+# releases whose apply_stylesheet side effects were checked against the reproduction below
+_verified_qt_material_versions = ("2.17",)
+
+
+def _qt_material_verified() -> bool:
+    try:
+        installed = version("qt-material")
+    except PackageNotFoundError:
+        return False
+    return ".".join(installed.split(".")[:2]) in _verified_qt_material_versions
+
+
+def _qt_material_path() -> Optional[str]:
+    spec = find_spec("qt_material")
+    if spec is None or not spec.submodule_search_locations:
+        return None
+    return spec.submodule_search_locations[0]
+
+
+def _add_fonts(package_path: str) -> None:
+    font_directory = join(package_path, "fonts", "roboto")
+    if not isdir(font_directory):
+        return
+    for font in listdir(font_directory):
+        if font.endswith(".ttf"):
+            QFontDatabase.addApplicationFont(join(font_directory, font))
+
+
+def _primary_color(theme_file: str) -> Optional[str]:
+    document = parse(theme_file)
+    for child in document.getElementsByTagName("color"):
+        if child.getAttribute("name") == "primaryColor":
+            return child.firstChild.nodeValue
+    return None
+
+
+def _set_palette(primary_color: str) -> None:
+    palette = QGuiApplication.palette()
+    color = QColor(*[int(primary_color[i:i + 2], 16) for i in range(1, 6, 2)], 92)
+    palette.setColor(QPalette.ColorRole.Text, color)
+    QGuiApplication.setPalette(palette)
+
+
+# qt_material's stylesheet used to be applied and then replaced by style.qss straight away, so only its side
+# effects ever showed: the Fusion style, the Roboto fonts and the palette text color. Those are reproduced
+# here without importing qt_material, which renders a jinja template and regenerates its icons every start.
+# Any other qt_material release may have changed them, so it still goes through apply_stylesheet.
+def apply_theme(app: QApplication, theme: str, qss_resource: str) -> None:
+    package_path = _qt_material_path()
+    if package_path is None:
+        app.setStyle("Fusion")
+        logger.warning("qt_material not found, using the application stylesheet only")
+    elif not _qt_material_verified():
+        from qt_material import apply_stylesheet
+        logger.debug("Unverified qt_material release, applying its stylesheet")
+        apply_stylesheet(app, theme=theme)
+    else:
+        app.setStyle("Fusion")
+        _add_fonts(package_path)
+        QDir.addSearchPath("qt_material", join(package_path, "resources"))
+        theme_file = join(package_path, "themes", theme)
+        primary_color = _primary_color(theme_file) if isfile(theme_file) else None
+        if primary_color is None:
+            logger.warning(f"Theme {theme} not found")
+        else:
+            _set_palette(primary_color)
+    app.setStyleSheet(QSSLoader.readQssResource(qss_resource))
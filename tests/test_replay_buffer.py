@@ -0,0 +1,23 @@
+from time import time
+
+from src.core.replay_buffer import ReplayBuffer
+from src.model.voice_models import VoicePacket
+
+
+def test_expired_keys_are_dropped():
+    buffer = ReplayBuffer(duration=10, gap_time=0.5)
+    now = time()
+    buffer.add_packet(VoicePacket(1, 0, 122800, "A", b"\x01"), now - 100)
+    buffer.add_packet(VoicePacket(2, 0, 121500, "B", b"\x01"), now)
+    assert buffer.transmissions(frequency=122800) == []
+    assert 122800 not in buffer._by_frequency
+    assert 1 not in buffer._by_speaker
+    assert [item.cid for item in buffer.transmissions()] == [2]
+
+
+def test_reads_skip_transmissions_past_retention():
+    buffer = ReplayBuffer(duration=10, gap_time=0.5)
+    buffer.add_packet(VoicePacket(1, 0, 122800, "A", b"\x01"), time() - 100)
+    # nothing was added since, the read itself has to evict
+    assert buffer.last_transmission(122800) is None
+    assert buffer._by_frequency == {}
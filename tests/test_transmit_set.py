@@ -0,0 +1,70 @@
+import pytest
+
+pytest.importorskip("PySide6")
+pytest.importorskip("loguru")
+
+
+class FakeNetwork:
+    def __init__(self):
+        self.messages = []
+
+    def send_control_message(self, message):
+        self.messages.append(message)
+
+
+@pytest.fixture
+def voice_client(tmp_path, monkeypatch):
+    # the config is created in the working directory on first import
+    monkeypatch.chdir(tmp_path)
+    from src.core.voice_client import VoiceClient
+    from src.model import ConnectionState
+    from src.signal import AudioSignal, Signals
+    client = VoiceClient(Signals(), AudioSignal(), enable_audio=False)
+    client._network = FakeNetwork()
+    client._connection_state = ConnectionState.READY
+    client.cid = 1
+    client.callsign = "TEST"
+    yield client
+    client._talk_state.stop()
+
+
+def switch_messages(client):
+    from src.model import MessageType
+    return [(message.transmitter, message.data) for message in client._network.messages
+            if message.type == MessageType.SWITCH]
+
+
+def test_remove_sends_zero_frequency(voice_client):
+    voice_client.add_transmit_frequency(122800, 1)
+    voice_client.add_transmit_frequency(121500, 2)
+    voice_client.remove_transmit_frequency(2)
+    assert switch_messages(voice_client) == [(1, "122800"), (2, "121500"), (2, "0")]
+    assert voice_client._transmit_targets == ((1, 122800),)
+
+
+def test_switch_removes_other_transmitters(voice_client):
+    voice_client.add_transmit_frequency(122800, 1)
+    voice_client.switch_frequency(118100, 0)
+    assert switch_messages(voice_client) == [(1, "122800"), (1, "0"), (0, "118100")]
+    assert voice_client._transmit_targets == ((0, 118100),)
+
+
+def test_clear_sends_zero_for_every_transmitter(voice_client):
+    voice_client.add_transmit_frequency(122800, 1)
+    voice_client.add_transmit_frequency(121500, 2)
+    voice_client.clear_frequency()
+    assert switch_messages(voice_client)[-2:] == [(1, "0"), (2, "0")]
+    assert voice_client._transmit_targets == ()
+
+
+def test_binding_switches_instead_of_adding(voice_client):
+    from src.constants import ptt_binding_transmitter
+    from src.core.ptt_controller import PTTTarget
+    voice_client._is_atc = True
+    voice_client.add_transmit_frequency(122800, 1)
+    voice_client.set_transmitter_frequency(2, 121500)
+    assert voice_client.select_transmitter(PTTTarget(ptt_binding_transmitter, 2))
+    # swapped before ptt goes active, without waiting for the GUI thread
+    assert voice_client._transmit_targets == ((2, 121500),)
+    voice_client._apply_transmitter_selection(2, 121500)
+    assert switch_messages(voice_client)[-2:] == [(1, "0"), (2, "121500")]